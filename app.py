@@ -11,8 +11,7 @@ question on Piazza.
 # 2021/12/07
 """
 from consts import *
-from game2d import *
-from wave import *
+from game2d import GameApp, GBitmapText, GLabel, GRectangle, VoicePool
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via getters/setters
 # Invaders is NOT allowed to access anything in models.py
@@ -78,6 +77,14 @@ class Invaders(GameApp):
     #
     #Attribute _background: The background of the game
     #Invariant: _background is a GRectangle object
+    #
+    #Attribute _messages: The messages of the states, each made once
+    #Invariant: _messages is a dict whose values are GLabel objects, with the
+    #key 'loading', and also 'start', 'continue', 'win' and 'lose' once the
+    #assets are loaded
+    #
+    #Attribute _voices: The voices playing the sounds of the game
+    #Invariant: _voices is a VoicePool object with ALIEN_SOUND and SHIP_SOUND
 
     # DO NOT MAKE A NEW INITIALIZER!
 
@@ -95,7 +102,32 @@ class Invaders(GameApp):
         given invariants. When done, it sets the _state to STATE_INACTIVE and
         create a message (in attribute _text) saying that the user should press
         to play a game.
+
+        The assets are loaded in the background while the game is inactive.
+        The images are packed into one texture once decoded, so that the
+        sprites share it, and then the voices of the explosions are made.  The
+        sounds are decoded once, and shared by every ship and alien.  The
+        explosions play on a pool of voices, so that they can overlap.  The
+        module wave is imported next (see _loadwave).  Rendering text is slow,
+        so the text of the wave and the messages shown after loading are
+        rendered last; only the loading message is made right away.  The view
+        is put in retained mode, since most of the screen is the same from one
+        frame to the next, and divided into the layers of VIEW_LAYERS.
         """
+        self._voices = VoicePool()
+        loader = self.preload(pack=True)
+        loader.add(lambda: self._voices.add(ALIEN_SOUND,ALIEN_VOICES))
+        loader.add(lambda: self._voices.add(SHIP_SOUND,SHIP_VOICES))
+        loader.add(self._loadwave)
+        loader.add(lambda: GBitmapText.preload(ARCADE_FONT,ARCADE_SMALL))
+        self._messages = {}
+        self._makemessage('loading')
+        for key in ['start','continue','win','lose']:
+            loader.add(lambda key=key: self._makemessage(key))
+        self.view.retained = True
+        for depth in range(len(VIEW_LAYERS)):
+            (name,static) = VIEW_LAYERS[depth]
+            self.view.addlayer(name,depth,static)
         self._state = STATE_INACTIVE
         self._cong = False
         self._wave = None
@@ -103,9 +135,7 @@ class Invaders(GameApp):
         self._background = GRectangle(x=GAME_WIDTH//2,y=GAME_HEIGHT//2,\
         width=GAME_WIDTH,height=GAME_HEIGHT,fillcolor=DARK_GREY)
         if self._state == STATE_INACTIVE:
-            self._text = GLabel(text="Press 'S' to Play",\
-            font_size=ARCADE_LARGE,font_name=ARCADE_FONT,x=400,y=350,\
-            linecolor=WHITE_COLOR)
+            self._text = self._messages['loading']
         else:
             self._text = None
 
@@ -127,10 +157,11 @@ class Invaders(GameApp):
 
         STATE_INACTIVE: This is the state when the application first opens.
         It is a paused state, waiting for the player to start the game.  It
-        displays a simple message on the screen. The application remains in
-        this state so long as the player never presses a key.  In addition,
-        this is the state the application returns to when the game is over
-        (all lives are lost or all aliens are dead).
+        displays a simple message on the screen, once the assets are loaded.
+        The application remains in this state so long as the player never
+        presses a key.  In addition, this is the state the application
+        returns to when the game is over (all lives are lost or all aliens
+        are dead).
 
         STATE_NEWWAVE: This is the state creates a new wave and shows it on
         the screen. The application switches to this state if the state was
@@ -160,12 +191,18 @@ class Invaders(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        if self._state == STATE_INACTIVE and self.input.is_key_down('s') and \
+        if self._state == STATE_INACTIVE and not self.loader.done:
+            self._text = self._messages['loading']
+        elif self._state == STATE_INACTIVE and self._text is \
+        self._messages['loading']:
+            self._text = self._messages['start']
+        elif self._state == STATE_INACTIVE and self.input.is_key_down('s') and \
         self._keypressed():
             self._state = STATE_NEWWAVE
             self._text = None
         elif self._state == STATE_NEWWAVE:
-            self._wave = Wave()
+            self._wave = self._loadwave()(voices=self._voices)
+            self.view.layer(VIEW_HUD).invalidate()
             self._state = STATE_ACTIVE
         elif self._state == STATE_ACTIVE:
             self._wave.update(dt,self.input)
@@ -178,10 +215,12 @@ class Invaders(GameApp):
             self._wave.resumegame()
             self._state = STATE_ACTIVE
         elif self._state == STATE_COMPLETE:
-            self._wave = None
+            if self._wave is not None:
+                self._wave = None
+                self.view.layer(VIEW_HUD).invalidate()
             self._endmessage()
 
-    def draw(self):
+    def draw(self,alpha=1.0):
         """
         Draws the game objects to the view.
 
@@ -194,14 +233,63 @@ class Invaders(GameApp):
         getters for these attributes or you need to add a draw method to
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
+
+        The wave only moves while the game is active, so the ship and bolts
+        are only drawn in between two updates in STATE_ACTIVE.
+
+        Each object goes to its own layer of the view, so the order of the
+        calls does not matter.  The background and the hud are static layers;
+        drawing them again only costs something after they are invalidated.
+
+        The sounds played in the updates of this frame are started last, so
+        that the sounds of every step of the frame are started together.
+
+        Parameter alpha: the fraction of a step since the last update
+        Precondition: alpha is a float in 0..1
         """
-        self._background.draw(self.view)
+        self._background.draw(self.view.layer(VIEW_BACKGROUND))
         if self._wave is not None:
-            self._wave.draw(self.view)
+            if self._state != STATE_ACTIVE:
+                alpha = 1.0
+            self._wave.draw(self.view,alpha)
         if self._text is not None:
-            self._text.draw(self.view)
+            self._text.draw(self.view.layer(VIEW_OVERLAY))
+        self._voices.update()
 
     # HELPER METHODS FOR THE STATES GO HERE
+    def _makemessage(self,key):
+        """
+        Makes the message shown in a state, and adds it to _messages.
+
+        Making a GLabel renders its text, so every message is made once (in
+        start, or while the assets load) and then reused, instead of being
+        made again in every frame.
+
+        Parameter key: the name of the message
+        Precondition: key is one of 'loading', 'start', 'continue', 'win'
+        or 'lose'
+        """
+        texts = {'loading':("Loading...",ARCADE_LARGE),
+                 'start':("Press 'S' to Play",ARCADE_LARGE),
+                 'continue':("Press 'S' to Continue",ARCADE_MEDIUM),
+                 'win':("You Win",ARCADE_LARGE),
+                 'lose':("Game Over",ARCADE_LARGE)}
+        (text,size) = texts[key]
+        self._messages[key] = GLabel(text=text,font_size=size,\
+        font_name=ARCADE_FONT,x=400,y=350,linecolor=WHITE_COLOR)
+
+    def _loadwave(self):
+        """
+        Returns the class Wave, importing the module wave the first time.
+
+        The module wave imports numpy and the simulation, which are slow to
+        import and not needed until the first wave.  So wave is not imported
+        with this module, but while the assets load (or at the latest in
+        STATE_NEWWAVE).
+        """
+        from wave import Wave
+        return Wave
+
     def _endmessage(self):
         """
         Set the ending message on the screen when the game is over
@@ -210,11 +298,9 @@ class Invaders(GameApp):
         State "game over" otherwise
         """
         if self._cong == True:
-            self._text = GLabel(text="You Win",font_size=ARCADE_LARGE,\
-            font_name=ARCADE_FONT,x=400,y=350,linecolor=WHITE_COLOR)
+            self._text = self._messages['win']
         else:
-            self._text = GLabel(text="Game Over",font_size=ARCADE_LARGE,\
-            font_name=ARCADE_FONT,x=400,y=350,linecolor=WHITE_COLOR)
+            self._text = self._messages['lose']
 
     def _pausechange(self):
         """
@@ -225,8 +311,7 @@ class Invaders(GameApp):
         is over. The player continue the game when a key is pressed and the game
         is not over.
         """
-        self._text=GLabel(text="Press 'S' to Continue",font_size=ARCADE_MEDIUM,\
-        font_name=ARCADE_FONT,x=400,y=350,linecolor=WHITE_COLOR)
+        self._text = self._messages['continue']
         if self._wave.getLives() <= 0:
             self._state = STATE_COMPLETE
             self._cong = False
@@ -9,7 +9,6 @@ allows all modules to access them.
 # Rachel Yan (sy625)
 # 2021/12/07
 """
-import introcs
 import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
@@ -18,6 +17,8 @@ import sys
 GAME_WIDTH  = 800
 #: the height of the game display
 GAME_HEIGHT = 700
+#: the number of game updates per second, independent of the frame rate
+GAME_TICKRATE = 60
 
 
 ### SHIP CONSTANTS ###
@@ -34,6 +35,8 @@ SHIP_MOVEMENT = 5
 SHIP_LIVES    = 3
 # How many seconds a death animation takes
 DEATH_SPEED   = 0.3
+# The filmstrip grid (rows, columns) of the ship explosion
+SHIP_FORMAT   = (2,4)
 # The y-coordinate of the defensive line the ship is protecting
 DEFENSE_LINE = 100
 
@@ -74,6 +77,39 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the number of bolts each bolt store has room for ahead of time
+BOLT_POOL   = 16
+
+
+### EVENT CONSTANTS ###
+
+# event when an alien is destroyed; the data is its (row,col)
+EVENT_KILL = 0
+# event when a bolt hits the ship; there is no data
+EVENT_HIT  = 1
+# event when a bolt is fired; the data is its velocity
+EVENT_FIRE = 2
+# event when the last alien is destroyed; there is no data
+EVENT_WIN  = 3
+# event when the last life is lost; there is no data
+EVENT_LOSE = 4
+
+
+### VIEW CONSTANTS ###
+
+# the layers of the view, from back to front, as (name,static) pairs
+VIEW_LAYERS = (('background',True),('world',False),('bolts',False),
+               ('hud',True),('overlay',False))
+# the static layer with the background
+VIEW_BACKGROUND = 'background'
+# the layer with the aliens and the ship
+VIEW_WORLD   = 'world'
+# the layer with the laser bolts
+VIEW_BOLTS   = 'bolts'
+# the static layer with the defense line, lives and score
+VIEW_HUD     = 'hud'
+# the layer with the messages
+VIEW_OVERLAY = 'overlay'
 
 
 ### GAME CONSTANTS ###
@@ -131,6 +167,10 @@ ALIEN_POINTS = 10
 ALIEN_SOUND = 'pop2.wav'
 # The sound of the ship
 SHIP_SOUND = 'blast1.wav'
+# The number of voices playing the alien sound at once
+ALIEN_VOICES = 4
+# The number of voices playing the ship sound at once
+SHIP_VOICES = 2
 # The font choice for labels and messages
 ARCADE_FONT = 'Arcade.ttf'
 # A large message or label
@@ -139,7 +179,7 @@ ARCADE_LARGE  = 60
 ARCADE_MEDIUM = 48
 # A small message or label
 ARCADE_SMALL  = 32
-# The background color
-DARK_GREY = introcs.RGB(32, 32, 32)
+# The background color, as RGB(32, 32, 32) in the range 0..1
+DARK_GREY = (32/255.0, 32/255.0, 32/255.0, 1.0)
 # text color
-WHITE_COLOR = introcs.RGB(255, 255, 255)
+WHITE_COLOR = (1.0, 1.0, 1.0, 1.0)
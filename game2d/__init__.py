@@ -4,13 +4,49 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+The classes of this package are only imported when they are first used.  Kivy is slow
+to import, so a module that only needs :class:`CollisionWorld` never loads it.  The
+statement ``from game2d import *`` still imports every class.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import importlib
+
+# The module defining each class of the package
+_EXPORTS = {
+    'GObject':'gobject', 'GScene':'gobject',
+    'GRectangle':'grectangle', 'GEllipse':'grectangle', 'GImage':'grectangle',
+    'GLabel':'grectangle', 'GBatch':'grectangle',
+    'GSprite':'gsprite',
+    'GBitmapText':'gtext',
+    'GPath':'gpath', 'GTriangle':'gpath', 'GPolygon':'gpath',
+    'GInput':'gview', 'GView':'gview', 'GLayer':'gview',
+    'Sound':'sound', 'SoundLibrary':'sound', 'VoicePool':'sound',
+    'CollisionWorld':'collision',
+    'GameApp':'app',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Returns the class with the given name, importing its module the first time.
+
+    :param name: The name of the class
+    :type name:  ``str``
+    """
+    if not name in _EXPORTS:
+        raise AttributeError('module %s has no attribute %s' % (repr(__name__),repr(name)))
+    value = getattr(importlib.import_module('.'+_EXPORTS[name],__name__),name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    :return: The names in this package, including the classes not imported yet.
+    :rtype:  ``list``
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -16,9 +16,9 @@ import kivy.app
 # Lower-level kivy modules to support animation
 from kivy.config import Config
 from kivy.clock  import Clock
-import numpy as np
 
 import os.path
+import time
 
 class GameApp(kivy.app.App):
     """
@@ -41,6 +41,11 @@ class GameApp(kivy.app.App):
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute for tracking decoded images (until they are packed in an atlas)
+    IMAGE_CACHE = {}
+    # The file extensions of images and sounds, for the methods that list a folder
+    IMAGE_TYPES = ('.png','.jpg','.jpeg','.gif')
+    SOUND_TYPES = ('.wav','.mp3','.ogg')
     
     
     # MUTABLE ATTRIBUTES
@@ -65,6 +70,50 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def tickrate(self):
+        """
+        The number of simulation steps per second, or None for one step per frame
+        
+        By default this value is None, and `update` is called once every animation
+        frame with the time since the last frame.  If it is a number, the game runs in
+        fixed-step mode instead: `update` is called with ``1.0/tickrate`` as many times
+        as needed to keep up with the clock, no matter the frame rate.  In that mode
+        `draw` is passed the interpolation alpha, which is the fraction (0..1) of a step
+        that has elapsed since the last update.  Use it to draw moving objects between
+        their previous and current positions.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tickrate
+    
+    @tickrate.setter
+    def tickrate(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._tickrate = value
+        self._accum = 0.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of simulation steps in a single animation frame
+        
+        This value only matters if `tickrate` is not None.  If a frame is so late that
+        it would need more steps than this to catch up, the remaining time is dropped
+        and the game slows down instead.  This prevents a slow `update` from falling
+        further and further behind.  The default value is 5.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
     
     # IMMUTABLE PROPERTIES
     @property
@@ -109,6 +158,15 @@ class GameApp(kivy.app.App):
         """
         return self._input
     
+    @property
+    def loader(self):
+        """
+        The asset loader started by :meth:`preload`, or None if there is none.
+        
+        **Immutable**: This value is set by :meth:`preload`.
+        """
+        return self._loader
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -191,6 +249,27 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_image(cls,name):
+        """
+        Returns: The decoded image for the given file name, without making a texture
+        
+        The ``name`` must refer to the file in the **Images** folder.  The image is the
+        Kivy ``ImageData`` read from the file, so its pixels are on the CPU.  If the
+        image was decoded ahead of time by :meth:`preload`, it will return that image.
+        
+        This method will crash if name is not a valid file.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert cls.is_image(name), '%s is not an image file' % repr(name)
+        if name in cls.IMAGE_CACHE:
+            return cls.IMAGE_CACHE[name]
+        
+        from kivy.core.image import ImageLoader
+        return ImageLoader.load(os.path.join(cls.images,name),nocache=True)._data[0]
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -211,6 +290,36 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def pack_textures(cls,names=None,width=1024):
+        """
+        Returns: A texture atlas with the given images, which load_texture then uses
+        
+        The images are packed into a single texture, and the region of each image is
+        put in the texture cache.  From then on, :meth:`load_texture` returns the region
+        in place of a separate texture, so any :class:`GImage` or :class:`GSprite` made
+        with one of these images draws from the atlas.  Objects made before this call
+        keep their old textures until they are reset.
+        
+        If ``names`` is None, every image in the **Images** folder is packed.  This 
+        method can only be called once the game window is open (e.g. in :meth:`start`).
+        
+        :param names: The file names of the images to pack, or None for every image
+        :type names:  ``list`` of ``str``, or None
+        
+        :param width: The width of the atlas in pixels
+        :type width:  ``int`` > 0
+        """
+        from .atlas import TextureAtlas
+        if names is None:
+            names = [name for name in sorted(os.listdir(cls.images)) 
+                     if os.path.splitext(name)[1].lower() in cls.IMAGE_TYPES]
+        atlas = TextureAtlas(names,width)
+        for name in names:
+            cls.TEXTURE_CACHE[name] = atlas.get(name)
+            cls.IMAGE_CACHE.pop(name,None)
+        return atlas
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -223,6 +332,9 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        The keywords ``fps``, ``tickrate`` and ``maxsteps`` may also be used to set the
+        attributes of the same name.
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -235,6 +347,8 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('tickrate', None)
+        m = keywords.pop('maxsteps', 5)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -244,6 +358,9 @@ class GameApp(kivy.app.App):
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self.tickrate = t
+        self.maxsteps = m
+        self._loader = None
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -301,13 +418,41 @@ class GameApp(kivy.app.App):
         """
         pass
     
+    def preload(self,workers=4,budget=0.004,pack=False):
+        """
+        Returns a new asset loader, which loads every asset while the game runs.
+        
+        The images and sounds are decoded on a pool of ``workers`` threads.  The rest
+        of the work (e.g. uploading images to the graphics card) has to happen in the
+        main thread.  It is done at the start of every animation frame, for at most
+        ``budget`` seconds a frame, until the loader is done.  Use the attributes
+        ``progress`` and ``done`` of the loader to know when the assets are ready.
+        
+        If ``pack`` is True, the images are packed in an atlas (as by 
+        :meth:`pack_textures`) once they are all decoded, and are never uploaded as
+        separate textures.
+        
+        This method should be called in :meth:`start`.
+        
+        :param workers: The number of threads decoding assets
+        :type workers:  ``int`` > 0
+        
+        :param budget: The time in seconds given to the loader each frame
+        :type budget:  ``int`` or ``float`` > 0
+        
+        :param pack: Whether to pack the images in an atlas
+        :type pack:  ``bool``
+        """
+        self._loader = AssetLoader(workers,budget,pack)
+        return self._loader
+    
     def update(self,dt):
         """
         Updates the state of the game one animation frame.
         
-        This method is called 60x a second (depending on the ``fps``) to provide on-screen 
-        animation. Any code that moves objects or processes user input (keyboard or mouse)
-        goes in this method.
+        This method is called 60x a second (depending on the ``fps``, or the ``tickrate``
+        if it is set) to provide on-screen animation. Any code that moves objects or
+        processes user input (keyboard or mouse) goes in this method.
         
         Think of this method as the body of the loop.  You will need to add attributes
         that represent the current animation state, so that they can persist across
@@ -324,6 +469,9 @@ class GameApp(kivy.app.App):
         
         Every single object that you draw will need to be an attribute of the ``GameApp``
         class.  This method should largely be a sequence of calls to ``self.view.draw()``.
+        
+        If `tickrate` is not None, this method is called with one argument instead: the
+        interpolation alpha, a float in 0..1.  See `tickrate` for more information.
         """
         pass
     
@@ -347,14 +495,33 @@ class GameApp(kivy.app.App):
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window and
+        running the fixed steps when `tickrate` is set.
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.update(dt)
-        self.draw()
+        if not self._loader is None and not self._loader.done:
+            self._loader.step()
+        if self._tickrate is None:
+            self.update(dt)
+            self.draw()
+            self.view._commit()
+            return
+        
+        step = 1.0/self._tickrate
+        self._accum += dt
+        steps = 0
+        while self._accum >= step and steps < self._maxsteps:
+            self.update(step)
+            self._accum -= step
+            steps += 1
+        # Drop whatever we could not catch up on
+        if self._accum >= step:
+            self._accum %= step
+        self.draw(self._accum/step)
+        self.view._commit()
     
     def _setpaths(self):
         """
@@ -377,3 +544,179 @@ class GameApp(kivy.app.App):
         kivy.resources.resource_add_path(GameApp.sounds)
         kivy.resources.resource_add_path(GameApp.images)
 
+
+# #mark -
+class AssetLoader(object):
+    """
+    A class loading the assets of a game in the background.
+    
+    The files in the **Images** and **Sounds** folders are first read (and for images,
+    decoded) on a pool of threads.  Each asset is then finished in the main thread by
+    :meth:`step`, in the order the files were found: images are uploaded to the texture
+    cache of :class:`GameApp` (or packed together in an atlas, once they are all
+    decoded), and sounds are put in the cache of :meth:`Sound.load`.  Any other work
+    that must wait for the assets can be queued with :meth:`add`.
+    
+    Fonts are not loaded here, since Kivy opens a font once for every size it is used
+    at.  To have text ready before it is needed, queue the work that renders it with
+    :meth:`add` (e.g. :meth:`GBitmapText.preload`, or making a :class:`GLabel`).
+    
+    **You should never construct an object of this class**.  Use :meth:`GameApp.preload`
+    instead, which steps the loader at the start of every frame.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def progress(self):
+        """
+        The fraction of the work done, from 0 to 1.
+        
+        **Immutable**: This value is changed by :meth:`step`.
+        """
+        if not self._total:
+            return 1.0
+        return self._finished/self._total
+    
+    @property
+    def done(self):
+        """
+        Whether all of the work is done.
+        
+        **Immutable**: This value is changed by :meth:`step`.
+        """
+        return self._finished == self._total
+    
+    # BUILT-IN METHODS
+    def __init__(self,workers=4,budget=0.004,pack=False):
+        """
+        Starts loading every asset in the background.
+        
+        :param workers: The number of threads decoding assets
+        :type workers:  ``int`` > 0
+        
+        :param budget: The time in seconds that each call to step may take
+        :type budget:  ``int`` or ``float`` > 0
+        
+        :param pack: Whether to pack the images in an atlas instead of uploading them
+        :type pack:  ``bool``
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        assert type(workers) == int and workers > 0, '%s is not a valid worker count' % repr(workers)
+        assert type(budget) in [int,float] and budget > 0, '%s is not a valid budget' % repr(budget)
+        assert type(pack) == bool, '%s is not a bool' % repr(pack)
+        self._budget = budget
+        self._pack = pack
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        # Each job is (finish,name,future), where future is None for work added later
+        self._jobs = []
+        for (folder,types,work,finish) in (
+            (GameApp.images,GameApp.IMAGE_TYPES,self._decode,self._upload),
+            (GameApp.sounds,GameApp.SOUND_TYPES,self._read,self._sound)):
+            for name in sorted(os.listdir(folder)):
+                if os.path.splitext(name)[1].lower() in types:
+                    path = os.path.join(folder,name)
+                    self._jobs.append((finish,name,self._executor.submit(work,path)))
+            if pack and finish == self._upload:
+                names = [job[1] for job in self._jobs]
+                self._jobs.append((lambda: GameApp.pack_textures(names),None,None))
+        self._executor.shutdown(wait=False)
+        self._total = len(self._jobs)
+        self._finished = 0
+    
+    # PUBLIC METHODS
+    def add(self,work):
+        """
+        Queues work to do in the main thread once every asset before it is loaded.
+        
+        :param work: The work to do
+        :type work:  a function with no arguments
+        """
+        assert callable(work), '%s is not callable' % repr(work)
+        self._jobs.append((work,None,None))
+        self._total += 1
+    
+    def step(self):
+        """
+        Finishes the assets decoded so far, for at most the time budget.
+        
+        This returns early if the next asset is not decoded yet, so that the frame is
+        never blocked by the threads.
+        
+        :return: The fraction of the work done, from 0 to 1.
+        :rtype:  ``float``
+        """
+        start = time.perf_counter()
+        while self._finished < self._total:
+            (finish,name,future) = self._jobs[self._finished]
+            if future is None:
+                finish()
+            elif not future.done():
+                break
+            elif future.exception() is None:
+                finish(name,future.result())
+            else:
+                print('Failed to load',repr(name))
+            self._jobs[self._finished] = None
+            self._finished += 1
+            if time.perf_counter()-start >= self._budget:
+                break
+        return self.progress
+    
+    # HIDDEN METHODS
+    def _decode(self,path):
+        """
+        Returns the decoded image in the given file, without making a texture.
+        
+        This method is run by the threads.
+        
+        :param path: The path of the image file
+        :type path:  ``str``
+        """
+        from kivy.core.image import ImageLoader
+        return ImageLoader.load(path,nocache=True)._data[0]
+    
+    def _read(self,path):
+        """
+        Returns the contents of the given file.
+        
+        Kivy can only open sounds by name, so this method only reads the file (bringing
+        it into the disk cache).  This method is run by the threads.
+        
+        :param path: The path of the file
+        :type path:  ``str``
+        """
+        with open(path,'rb') as file:
+            return file.read()
+    
+    def _upload(self,name,image):
+        """
+        Puts the texture of a decoded image in the texture cache.
+        
+        The decoded image is also kept for :meth:`GameApp.load_image`, so that packing
+        the images in an atlas never decodes them again.  The texture is made straight
+        from the image, as a Kivy ``Image`` would release the pixels once uploaded.  If
+        the images are to be packed, no texture is made, as the atlas replaces it.
+        
+        :param name: The file name of the image
+        :type name:  ``str``
+        
+        :param image: The decoded image
+        :type image:  a Kivy ``ImageData``
+        """
+        GameApp.IMAGE_CACHE[name] = image
+        if not self._pack and not name in GameApp.TEXTURE_CACHE:
+            from kivy.graphics.texture import Texture
+            GameApp.TEXTURE_CACHE[name] = Texture.create_from_data(image)
+    
+    def _sound(self,name,data):
+        """
+        Puts a sound in the cache of :meth:`Sound.load`.
+        
+        :param name: The file name of the sound
+        :type name:  ``str``
+        
+        :param data: The contents of the file (unused)
+        :type data:  ``bytes``
+        """
+        from .sound import Sound
+        Sound.load(name)
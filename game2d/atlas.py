@@ -0,0 +1,167 @@
+"""
+Texture atlas support for 2D game support.
+
+Every image loaded by :meth:`GameApp.load_texture` is normally its own texture, and Kivy
+must switch textures whenever it draws an object with a different image.  This module
+packs many images into a single texture, called an atlas, and remembers the region of
+the atlas that holds each image.  The regions are used exactly like the textures they
+replace, so a :class:`GImage` or :class:`GSprite` never knows the difference.
+
+The images are packed in shelves: they are sorted by height, and placed left to right
+in rows as tall as the first image of the row.  This wastes a little room, but is
+simple and fast for the handful of images in a game.
+"""
+from .app import GameApp
+
+
+class TextureAtlas(object):
+    """
+    A class representing many images packed into one texture.
+
+    You should not need to use this class directly.  The method
+    :meth:`GameApp.pack_textures` builds an atlas and makes :meth:`GameApp.load_texture`
+    return its regions.
+    """
+    # The empty pixels kept around every image, so that filtering never bleeds
+    PADDING = 1
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture holding every image.
+
+        **Immutable**: This value cannot be changed after the atlas is made.
+        """
+        return self._texture
+
+    @property
+    def regions(self):
+        """
+        The regions of the atlas, by image file name.
+
+        **Immutable**: This value cannot be changed after the atlas is made.
+        """
+        return dict(self._regions)
+
+    # BUILT-IN METHODS
+    def __init__(self,names,width=1024):
+        """
+        Packs the given images into a new atlas.
+
+        The atlas is ``width`` pixels wide (or as wide as the widest image) and as tall
+        as the images need.
+
+        :param names: The file names of the images in the **Images** folder
+        :type names:  ``list`` of ``str``
+
+        :param width: The width of the atlas in pixels
+        :type width:  ``int`` > 0
+        """
+        from kivy.graphics.texture import Texture
+        assert type(width) == int and width > 0, '%s is not a valid width' % repr(width)
+        for name in names:
+            assert GameApp.is_image(name), '%s is not an image file' % repr(name)
+
+        pad = self.PADDING
+        images = []
+        for name in names:
+            image = GameApp.load_image(name)
+            images.append((name,image.width,image.height,self._rows(image)))
+        images.sort(key=lambda image: -image[2])
+        width = max([width]+[image[1]+2*pad for image in images])
+
+        # Place the images on shelves
+        places = []
+        x = 0
+        y = 0
+        shelf = 0
+        for (name,w,h,rows) in images:
+            if x+w+2*pad > width:
+                x = 0
+                y += shelf
+                shelf = 0
+            places.append((x+pad,y+pad))
+            x += w+2*pad
+            shelf = max(shelf,h+2*pad)
+        height = max(1,y+shelf)
+
+        # Copy the pixels; the rows of a texture start at the bottom
+        buffer = bytearray(width*height*4)
+        for pos in range(len(images)):
+            (name,w,h,rows) = images[pos]
+            (x0,y0) = places[pos]
+            for row in range(h):
+                start = ((y0+row)*width+x0)*4
+                buffer[start:start+w*4] = rows[row]
+
+        self._texture = Texture.create(size=(width,height),colorfmt='rgba')
+        self._texture.blit_buffer(bytes(buffer),colorfmt='rgba',bufferfmt='ubyte')
+        self._regions = {}
+        for pos in range(len(images)):
+            (name,w,h,rows) = images[pos]
+            (x0,y0) = places[pos]
+            self._regions[name] = self._texture.get_region(x0,y0,w,h)
+
+    def __contains__(self,name):
+        """
+        :return: True if the image ``name`` is in this atlas.
+        :rtype:  ``bool``
+        """
+        return name in self._regions
+
+    # PUBLIC METHODS
+    def get(self,name):
+        """
+        Returns the region of the atlas holding the given image.
+
+        :param name: The file name of the image
+        :type name:  ``str`` of an image in this atlas
+        """
+        return self._regions[name]
+
+    # HIDDEN METHODS
+    def _rows(self,image):
+        """
+        Returns the rows of RGBA pixels of a decoded image, bottom row first.
+
+        The pixels come straight from the decoded file, so the atlas is never read
+        back from the graphics card.  Most files are decoded top row first, which
+        Kivy marks by ``flip_vertical``.
+
+        :param image: The decoded image
+        :type image:  a Kivy ``ImageData``
+        """
+        fmt = image.fmt
+        assert fmt in ('rgba','bgra','rgb','bgr'), '%s is not a supported format' % repr(fmt)
+        w = image.width
+        size = len(fmt)
+        stride = image.rowlength if image.rowlength else w*size
+        data = image.data
+        rows = []
+        for row in range(image.height):
+            pixels = data[row*stride:row*stride+w*size]
+            if fmt != 'rgba':
+                pixels = self._rgba(pixels,fmt)
+            rows.append(bytes(pixels))
+        if image.flip_vertical:
+            rows.reverse()
+        return rows
+
+    def _rgba(self,pixels,fmt):
+        """
+        Returns a row of pixels converted to RGBA.
+
+        :param pixels: The row of pixels
+        :type pixels:  ``bytes``
+
+        :param fmt: The format of the pixels
+        :type fmt:  one of 'bgra', 'rgb' or 'bgr'
+        """
+        size = len(fmt)
+        result = bytearray(len(pixels)//size*4)
+        for channel in range(size):
+            result['rgba'.index(fmt[channel])::4] = pixels[channel::size]
+        if size == 3:
+            result[3::4] = b'\xff'*(len(pixels)//size)
+        return result
@@ -0,0 +1,408 @@
+"""
+Broadphase collision detection for 2D game support.
+
+This module provides a collision world, which finds the objects that might be touching
+without testing every object against every other object.  The world is a spatial hash:
+the plane is divided into square cells, and every object is stored in the cells that
+its bounding box overlaps.  Only objects that share a cell are ever compared.
+
+Objects are sorted into layers, so that a query can be restricted to the kinds of
+objects that matter (e.g. bolts fired by the player only hit aliens).  The world only
+compares bounding boxes.  If your objects need a more precise test, apply it to the
+pairs that the world returns.
+
+This module also has the precise test used for laser bolts: :func:`probehit` for a
+bolt at rest, and :func:`probesweep` for a bolt moving since the last update.
+
+Unlike the rest of this package, this module does not use Kivy.
+"""
+
+#: The mask accepting every layer
+ALL_LAYERS = -1
+
+
+def is_bounds(b):
+    """
+    Checks whether a value is a valid bounding box.
+
+    A bounding box is a tuple (x,y,width,height), where (x,y) is the center of the box
+    (as with :class:`GObject`).
+
+    :return: True if b is a valid bounding box
+    :rtype:  ``bool``
+
+    :param b: The value to test
+    :type b:  any
+    """
+    try:
+        return len(b) == 4 and all(type(z) in [int, float] for z in b) and b[2] >= 0 and b[3] >= 0
+    except:
+        return False
+
+
+def probereach(size):
+    """
+    Returns how far from the center of a target a bolt may be, along one axis, and still
+    hit the target.
+
+    A probe box the size of the target is centered on the bolt, with its corners
+    ``size//2`` from the bolt, and the bolt hits if a corner of the probe box is strictly
+    inside the target.  Along an axis where the target has the given size, the distance
+    between the centers must be less than ``size/2 + size//2``.
+
+    For an odd size, this is exactly the old test of the four corners.  For an even size
+    the old test also missed when the centers were aligned on that axis, as every corner
+    was then on an edge of the target (so a bolt through the middle of the 44 pixel ship
+    missed it).  That miss was a bug, like the repeated bottom-left corner of the old
+    test, and a bolt on the center line now hits.
+
+    :param size: The width or height of the target
+    :type size:  ``int`` or ``float`` > 0
+    """
+    return size/2.0+size//2
+
+
+def probehit(bx,by,tx,ty,width,height):
+    """
+    Returns True if the probe box around a bolt overlaps the target rectangle.
+
+    This is the only definition of a hit.  Along each axis the test is an open interval,
+    so the bolt hits exactly when ``|bx-tx| < probereach(width)`` and
+    ``|by-ty| < probereach(height)``.  It does no checking, as it is called for every
+    bolt and target.
+
+    :param bx: The x position of the bolt
+    :type bx:  ``int`` or ``float``
+
+    :param by: The y position of the bolt
+    :type by:  ``int`` or ``float``
+
+    :param tx: The x position of the center of the target
+    :type tx:  ``int`` or ``float``
+
+    :param ty: The y position of the center of the target
+    :type ty:  ``int`` or ``float``
+
+    :param width: The width of the target
+    :type width:  ``int`` or ``float`` > 0
+
+    :param height: The height of the target
+    :type height:  ``int`` or ``float`` > 0
+    """
+    return abs(bx-tx) < probereach(width) and abs(by-ty) < probereach(height)
+
+
+def probesweep(bx,y0,y1,tx,ty,width,height):
+    """
+    Returns the earliest time a bolt moving from y0 to y1 satisfies :func:`probehit`.
+
+    The bolt moves vertically at x position ``bx``.  The time is the fraction (0..1) of
+    the move at which the bolt first hits the target, so 0 means it was already touching
+    the target at ``y0``.  This finds hits even when the bolt moves farther than the size
+    of the target in one step.  If the bolt never hits the target during the move, this
+    returns None.
+
+    :param bx: The x position of the bolt
+    :type bx:  ``int`` or ``float``
+
+    :param y0: The y position of the bolt before the move
+    :type y0:  ``int`` or ``float``
+
+    :param y1: The y position of the bolt after the move
+    :type y1:  ``int`` or ``float``
+
+    :param tx: The x position of the center of the target
+    :type tx:  ``int`` or ``float``
+
+    :param ty: The y position of the center of the target
+    :type ty:  ``int`` or ``float``
+
+    :param width: The width of the target
+    :type width:  ``int`` or ``float`` > 0
+
+    :param height: The height of the target
+    :type height:  ``int`` or ``float`` > 0
+    """
+    if abs(bx-tx) >= probereach(width):
+        return None
+    # The open interval of y where the bolt hits
+    reach = probereach(height)
+    lo = ty-reach
+    hi = ty+reach
+    if lo < y0 < hi:
+        return 0.0
+    if y0 <= lo < y1:
+        return (lo-y0)/(y1-y0)
+    if y0 >= hi > y1:
+        return (y0-hi)/(y0-y1)
+    return None
+
+
+class CollisionWorld(object):
+    """
+    A class representing a collection of objects that may collide.
+
+    Any :class:`GObject` may be added to a world.  By default, the world uses the
+    attributes ``x``, ``y``, ``width`` and ``height`` of the object as its bounding box
+    (ignoring any rotation).  You may instead provide the bounding box explicitly, in
+    which case the object can be any hashable value, such as a tuple.
+
+    The world does not watch the objects it stores.  Whenever an object moves, you must
+    call :meth:`move` so that the world can find it again.  Moving an object is cheap
+    unless it is very large compared to the cell size.
+
+    Every object belongs to a layer and has a mask.  Layers are bit flags, like 1, 2, 4,
+    and so on.  The mask is the union of the layers the object collides with.  Two
+    objects collide only if each is in the mask of the other.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width and height of a cell of the spatial hash.
+
+        The best cell size is a little larger than the typical object.  Much smaller
+        cells make objects expensive to move, while much larger cells put too many
+        objects in the same cell.
+
+        **Immutable**: This value cannot be changed after the world is created.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._cellsize
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize=64):
+        """
+        Creates a new, empty collision world.
+
+        :param cellsize: The width and height of a cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], '%s is not a number' % repr(cellsize)
+        assert cellsize > 0, '%s is not positive' % repr(cellsize)
+        self._cellsize = cellsize
+        self._cells = {}
+        self._entries = {}
+        self._layers = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects in this world.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._entries)
+
+    def __contains__(self,obj):
+        """
+        :return: True if obj is in this world.
+        :rtype:  ``bool``
+        """
+        return obj in self._entries
+
+    def __iter__(self):
+        """
+        :return: The iterator over the objects in this world.
+        :rtype:  ``iterable``
+        """
+        return iter(self._entries.keys())
+
+    # PUBLIC METHODS
+    def add(self,obj,layer=1,mask=ALL_LAYERS,bounds=None):
+        """
+        Adds an object to this world.
+
+        If ``bounds`` is None, the bounding box is taken from the attributes of ``obj``.
+
+        :param obj: The object to add
+        :type obj:  :class:`GObject` or any hashable value if ``bounds`` is given
+
+        :param layer: The layer of the object
+        :type layer:  ``int`` with a single bit set
+
+        :param mask: The layers this object collides with
+        :type mask:  ``int``
+
+        :param bounds: The bounding box (x,y,width,height) of the object, or None
+        :type bounds:  ``tuple`` or None
+        """
+        assert not obj in self._entries, '%s is already in this world' % repr(obj)
+        assert type(layer) == int and layer > 0, '%s is not a valid layer' % repr(layer)
+        assert type(mask) == int, '%s is not a valid mask' % repr(mask)
+        assert bounds is None or is_bounds(bounds), '%s is not a valid bounding box' % repr(bounds)
+        entry = [layer,mask,None,None]
+        self._entries[obj] = entry
+        if not layer in self._layers:
+            self._layers[layer] = {}
+        self._layers[layer][obj] = entry
+        self._place(obj,entry,bounds)
+
+    def move(self,obj,bounds=None):
+        """
+        Updates the position of an object in this world.
+
+        If ``bounds`` is None, the bounding box is taken from the attributes of ``obj``.
+
+        :param obj: The object that moved
+        :type obj:  any object in this world
+
+        :param bounds: The new bounding box (x,y,width,height) of the object, or None
+        :type bounds:  ``tuple`` or None
+        """
+        entry = self._entries[obj]
+        self._unplace(obj,entry)
+        self._place(obj,entry,bounds)
+
+    def remove(self,obj):
+        """
+        Removes an object from this world.
+
+        :param obj: The object to remove
+        :type obj:  any object in this world
+        """
+        entry = self._entries.pop(obj)
+        del self._layers[entry[0]][obj]
+        self._unplace(obj,entry)
+
+    def clear(self):
+        """
+        Removes every object from this world.
+        """
+        self._cells.clear()
+        self._entries.clear()
+        self._layers.clear()
+
+    def query(self,bounds,mask=ALL_LAYERS):
+        """
+        Returns the objects whose bounding box overlaps the given one.
+
+        Boxes that only touch along an edge do not overlap.
+
+        :param bounds: The bounding box (x,y,width,height) to test
+        :type bounds:  ``tuple``
+
+        :param mask: The layers to look in
+        :type mask:  ``int``
+
+        :return: The objects overlapping ``bounds``, in no particular order
+        :rtype:  ``list``
+        """
+        box = self._box(bounds)
+        found = {}
+        for key in self._keys(box):
+            cell = self._cells.get(key)
+            if cell:
+                for obj in cell:
+                    entry = self._entries[obj]
+                    if entry[0] & mask and not obj in found and self._overlaps(box,entry[2]):
+                        found[obj] = None
+        return list(found)
+
+    def pairs(self,layer):
+        """
+        Returns the colliding pairs of objects with one object in the given layer.
+
+        Each pair is a tuple (a,b) where ``a`` is in ``layer``, each object is in the
+        mask of the other, and their bounding boxes overlap.  The work is proportional
+        to the number of objects in ``layer`` and their neighbors, not to the size of
+        the world.
+
+        :param layer: The layer of the first object of each pair
+        :type layer:  ``int`` with a single bit set
+
+        :return: The colliding pairs, in no particular order
+        :rtype:  ``list``
+        """
+        result = []
+        members = self._layers.get(layer)
+        if not members:
+            return result
+        for (a,ea) in members.items():
+            seen = {}
+            for key in ea[3]:
+                for b in self._cells[key]:
+                    if b is a or b in seen:
+                        continue
+                    seen[b] = None
+                    eb = self._entries[b]
+                    if ea[1] & eb[0] and eb[1] & ea[0] and self._overlaps(ea[2],eb[2]):
+                        result.append((a,b))
+        return result
+
+    # HIDDEN METHODS
+    def _box(self,bounds):
+        """
+        Returns the box (left,bottom,right,top) of a bounding box (x,y,width,height).
+
+        :param bounds: The bounding box to convert
+        :type bounds:  ``tuple``
+        """
+        (x,y,w,h) = bounds
+        return (x-w/2.0,y-h/2.0,x+w/2.0,y+h/2.0)
+
+    def _keys(self,box):
+        """
+        Returns the keys of the cells that the given box overlaps.
+
+        :param box: The box (left,bottom,right,top)
+        :type box:  ``tuple``
+        """
+        size = self._cellsize
+        x0 = int(box[0]//size)
+        y0 = int(box[1]//size)
+        x1 = int(box[2]//size)
+        y1 = int(box[3]//size)
+        return [(i,j) for i in range(x0,x1+1) for j in range(y0,y1+1)]
+
+    def _overlaps(self,a,b):
+        """
+        Returns True if the boxes a and b overlap.
+
+        :param a: The first box (left,bottom,right,top)
+        :type a:  ``tuple``
+
+        :param b: The second box (left,bottom,right,top)
+        :type b:  ``tuple``
+        """
+        return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+    def _place(self,obj,entry,bounds):
+        """
+        Stores an object in the cells overlapped by its bounding box.
+
+        :param obj: The object to store
+        :type obj:  any object in this world
+
+        :param entry: The world record [layer,mask,box,keys] of the object
+        :type entry:  ``list``
+
+        :param bounds: The bounding box (x,y,width,height) of the object, or None
+        :type bounds:  ``tuple`` or None
+        """
+        if bounds is None:
+            bounds = (obj.x,obj.y,obj.width,obj.height)
+        entry[2] = self._box(bounds)
+        entry[3] = self._keys(entry[2])
+        for key in entry[3]:
+            cell = self._cells.get(key)
+            if cell is None:
+                self._cells[key] = [obj]
+            else:
+                cell.append(obj)
+
+    def _unplace(self,obj,entry):
+        """
+        Removes an object from the cells that store it.
+
+        :param obj: The object to remove
+        :type obj:  any object in this world
+
+        :param entry: The world record [layer,mask,box,keys] of the object
+        :type entry:  ``list``
+        """
+        for key in entry[3]:
+            cell = self._cells[key]
+            cell.remove(obj)
+            if not cell:
+                del self._cells[key]
@@ -10,8 +10,6 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from introcs.geom import Point2, Matrix
-import introcs
 
 def is_color(c):
     """
@@ -554,7 +552,7 @@ class GObject(object):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        import numpy as np
+        from introcs.geom import Point2
         if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
@@ -579,6 +577,7 @@ class GObject(object):
         :return: The point transformed to local coordinate system
         :rtype:  :class:`Point2`
         """
+        from introcs.geom import Point2
         if isinstance(point,Point2):
             return self.inverse.transform(point)
         else:
@@ -615,6 +614,7 @@ class GObject(object):
         """
         Builds the transform matrices after a settings change.
         """
+        from introcs.geom import Matrix
         self._matrix = Matrix()
         self._matrix.translate(self._trans.x,self._trans.y)
         self._matrix.rotate(self._rotate.angle)
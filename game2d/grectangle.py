@@ -10,9 +10,7 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
-from kivy.uix.image import Image
-from .gobject import GObject
+from .gobject import GObject, is_color
 from .app import GameApp
 
 class GRectangle(GObject):
@@ -600,6 +598,8 @@ class GLabel(GRectangle):
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
+        # Kivy labels are slow to import, and only needed here
+        from kivy.uix.label import Label
         self._label = Label(**sanitized)
         self._label.size_hint = (None,None)
         
@@ -691,3 +691,149 @@ class GLabel(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
+
+
+# #mark -
+class GBatch(object):
+    """
+    A class to draw many rectangles with the same texture at once.
+
+    Every :class:`GRectangle` or :class:`GImage` is drawn with its own group of graphics
+    instructions (a transform, a rectangle, and so on).  That is a lot of work for Kivy
+    when there are dozens of objects that all look alike.  A batch instead collects the
+    rectangles of a frame as quads in a single mesh, which is drawn with one instruction.
+    The vertices of the mesh are rewritten every frame, but no instructions are made.
+
+    To use a batch, add the rectangles (or objects) to draw with :meth:`add` or
+    :meth:`addobject`, and then call :meth:`draw`.  Drawing a batch empties it, ready
+    for the next frame.  All of the rectangles share the texture and the color of the
+    batch.  Batched rectangles are never rotated, scaled or outlined.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture shared by every rectangle, or None for solid rectangles.
+
+        **Immutable**: This value cannot be changed after the batch is created.
+        """
+        return self._texture
+
+    @property
+    def count(self):
+        """
+        The number of rectangles added since the batch was last drawn.
+
+        **Immutable**: This value is changed by :meth:`add` and :meth:`draw`.
+        """
+        return self._count
+
+    # BUILT-IN METHODS
+    def __init__(self,source=None,fillcolor=None):
+        """
+        Creates a new, empty batch.
+
+        If ``fillcolor`` is None, textured rectangles are drawn as they are, and solid
+        rectangles are white.
+
+        :param source: The image file of the texture, or None for solid rectangles
+        :type source:  ``str`` or None
+
+        :param fillcolor: The color of (or tint of the texture of) every rectangle
+        :type fillcolor:  ``None`` or a color (as for :class:`GObject`)
+        """
+        import introcs
+        assert source is None or GameApp.is_image(source), '%s is not an image file' % repr(source)
+        assert fillcolor is None or is_color(fillcolor), '%s is not a valid color' % repr(fillcolor)
+        self._texture = None if source is None else GameApp.load_texture(source)
+
+        if fillcolor is None:
+            fillcolor = [1,1,1,1]
+        elif type(fillcolor) in [tuple, list] and len(fillcolor) == 3:
+            fillcolor = list(fillcolor)+[1.0]
+        elif type(fillcolor) in [introcs.RGB, introcs.HSV]:
+            fillcolor = fillcolor.glColor()
+        elif type(fillcolor) == str:
+            if fillcolor[0] == '#':
+                fillcolor = introcs.RGB.CreateWebColor(fillcolor).glColor()
+            else:
+                fillcolor = introcs.RGB.CreateName(fillcolor).glColor()
+
+        self._count = 0
+        self._vertices = []
+        self._indices  = []
+        self._mesh  = Mesh(mode='triangles',texture=self._texture)
+        self._cache = InstructionGroup()
+        self._cache.add(Color(fillcolor[0],fillcolor[1],fillcolor[2],fillcolor[3]))
+        self._cache.add(self._mesh)
+
+    # PUBLIC METHODS
+    def add(self,x,y,width,height,coords=None):
+        """
+        Adds a rectangle to draw in this frame.
+
+        The texture coordinates are given in the order used by Kivy: bottom left,
+        bottom right, top right and top left.  If they are None, the rectangle shows
+        the whole texture.
+
+        :param x: The horizontal coordinate of the rectangle center
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical coordinate of the rectangle center
+        :type y:  ``int`` or ``float``
+
+        :param width: The width of the rectangle
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: The height of the rectangle
+        :type height:  ``int`` or ``float`` > 0
+
+        :param coords: The texture coordinates of the four corners, or None
+        :type coords:  8-element sequence of ``float`` or None
+        """
+        if coords is None:
+            coords = (0,0,1,0,1,1,0,1) if self._texture is None else self._texture.tex_coords
+        left   = x-width/2.0
+        right  = x+width/2.0
+        bottom = y-height/2.0
+        top    = y+height/2.0
+        quad = (left,bottom,coords[0],coords[1], right,bottom,coords[2],coords[3],
+                right,top,coords[4],coords[5], left,top,coords[6],coords[7])
+
+        # Reuse the vertex list of earlier frames when possible
+        start = self._count*16
+        if start < len(self._vertices):
+            self._vertices[start:start+16] = quad
+        else:
+            self._vertices.extend(quad)
+            n = self._count*4
+            self._indices.extend((n,n+1,n+2,n+2,n+3,n))
+        self._count += 1
+
+    def addobject(self,obj):
+        """
+        Adds the bounding rectangle of an object to draw in this frame.
+
+        If the object has a texture (like a :class:`GImage` or the current frame of a
+        :class:`GSprite`), the rectangle shows that texture.  Any rotation or scaling
+        of the object is ignored.
+
+        :param obj: The object to add
+        :type obj:  :class:`GRectangle`
+        """
+        texture = getattr(obj,'_texture',None)
+        coords = None if texture is None else texture.tex_coords
+        self.add(obj.x,obj.y,obj.width,obj.height,coords)
+
+    def draw(self,view):
+        """
+        Draws every rectangle added since the last draw, and empties the batch.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        self._mesh.vertices = self._vertices[:self._count*16]
+        self._mesh.indices  = self._indices[:self._count*6]
+        self._count = 0
+        view.draw(self._cache)
@@ -33,7 +33,12 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are only cut out of its texture once.  Every sprite with
+    the same source and format shares the same frames.
     """
+    # The frames cut so far, as (texture,frames) by (source,format)
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -122,6 +127,39 @@ class GSprite(GRectangle):
         assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
         self._format = value
     
+    def _slice(self,texture):
+        """
+        Returns the frames of this filmstrip, cutting them out of texture if necessary.
+        
+        The frames are cached by source and format, and only cut again if the texture
+        of the source changed (e.g. it was packed into an atlas).
+        
+        :param texture: The texture of the source
+        :type texture:  a Kivy ``Texture``
+        """
+        key = (self.source,self._format)
+        entry = self.FRAME_CACHE.get(key)
+        if entry is not None and entry[0] is texture:
+            return entry[1]
+        
+        (rows,cols) = self._format
+        assert texture.width % cols == 0 and texture.height % rows == 0, \
+            '%s is not a %dx%d filmstrip' % (repr(self.source),rows,cols)
+        width  = texture.width//cols
+        height = texture.height//rows
+        
+        frames = []
+        ty = 0
+        for row in range(rows):
+            tx = 0
+            for col in range(cols):
+                frames.append(texture.get_region(tx,texture.height-ty-height,width,height))
+                tx += width
+            ty += height
+        frames = tuple(frames)
+        self.FRAME_CACHE[key] = (texture,frames)
+        return frames
+    
     def _reset(self):
         """
         Resets the drawing cache.
@@ -132,16 +170,7 @@ class GSprite(GRectangle):
         
         texture = GameApp.load_texture(self.source)
         if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+            self._images = self._slice(texture)
         else:
             print('Failed to load',repr(self.source))
         
@@ -0,0 +1,377 @@
+"""
+A module to support fast changing text.
+
+A :class:`GLabel` asks Kivy to render its whole string with the font every time the text
+changes.  That is fine for a title, but not for a score that changes many times a
+second.  This module instead renders every character of a font once into a single
+texture, called a glyph atlas.  A :class:`GBitmapText` draws its string as one textured
+quad per character, all in a single mesh, so changing the text only rewrites the
+vertices of that mesh.
+
+The atlas only contains the printable ASCII characters.  Any other character is drawn
+as a question mark.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+
+# #mark -
+class GlyphAtlas(object):
+    """
+    A class representing the characters of a font rendered into one texture.
+
+    The characters are laid out in a grid of cells of the same size, the size of the
+    largest character.  Each character is then drawn with the part of the texture that
+    holds it.  The advance of a character is its width in the texture.
+
+    Atlases are expensive to make, so you should never make one directly.  Use the
+    method :meth:`load`, which makes each atlas once and caches it.
+    """
+    # The characters in every atlas
+    CHARACTERS = ''.join(chr(c) for c in range(32,127))
+
+    # The number of cells in a row of the atlas
+    COLUMNS = 16
+
+    # The atlases made so far, by (font_name,font_size)
+    ATLAS_CACHE = {}
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture holding every character.
+
+        **Immutable**: This value cannot be changed after the atlas is made.
+        """
+        return self._texture
+
+    @property
+    def height(self):
+        """
+        The height of a line of text in this font.
+
+        **Immutable**: This value cannot be changed after the atlas is made.
+        """
+        return self._height
+
+    # CLASS METHODS
+    @classmethod
+    def load(cls,font_name,font_size):
+        """
+        Returns the atlas for the given font and size, making it if necessary.
+
+        :param font_name: The .ttf file of the font, or None for the Kivy font
+        :type font_name:  ``str`` or None
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+        """
+        key = (font_name,font_size)
+        if not key in cls.ATLAS_CACHE:
+            cls.ATLAS_CACHE[key] = cls(font_name,font_size)
+        return cls.ATLAS_CACHE[key]
+
+    # BUILT-IN METHODS
+    def __init__(self,font_name,font_size):
+        """
+        Renders every character of a font into a new atlas.
+
+        :param font_name: The .ttf file of the font, or None for the Kivy font
+        :type font_name:  ``str`` or None
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+        """
+        from kivy.core.text import Label
+        from kivy.graphics.texture import Texture
+
+        options = {'font_size':font_size}
+        if not font_name is None:
+            options['font_name'] = font_name
+
+        # Render each character on its own, keeping its pixels on the CPU
+        images = []
+        for char in self.CHARACTERS:
+            label = Label(text=char,**options)
+            label.refresh()
+            if label.width <= 1 or label.height <= 1:
+                (width,height) = label.get_extents(char)
+                images.append((int(width),int(height),None))
+            else:
+                # The refresh only measured the text, so render it into a stand-in
+                image = _GlyphImage()
+                label.texture = image
+                label.render(real=True)
+                images.append((label.width,label.height,image.rows))
+
+        cellw = max(1,max(image[0] for image in images))
+        cellh = max(1,max(image[1] for image in images))
+        rows  = (len(images)+self.COLUMNS-1)//self.COLUMNS
+        width  = cellw*self.COLUMNS
+        height = cellh*rows
+
+        # Copy the characters into their cells, row by row
+        buffer = bytearray(width*height*4)
+        self._glyphs = {}
+        for pos in range(len(images)):
+            (w,h,rows) = images[pos]
+            x0 = (pos % self.COLUMNS)*cellw
+            y0 = (pos //self.COLUMNS)*cellh
+            if not rows is None:
+                for row in range(h):
+                    start = ((y0+row)*width+x0)*4
+                    buffer[start:start+w*4] = rows[row]
+            # The cells are stored top row first, so the top of a cell is its lower v
+            self._glyphs[self.CHARACTERS[pos]] = (w,x0/width,y0/height,
+                                                  (x0+w)/width,(y0+cellh)/height)
+
+        self._texture = Texture.create(size=(width,height),colorfmt='rgba')
+        self._texture.blit_buffer(bytes(buffer),colorfmt='rgba',bufferfmt='ubyte')
+        self._height = cellh
+
+    # PUBLIC METHODS
+    def glyph(self,char):
+        """
+        Returns the advance and texture coordinates of a character.
+
+        The result is a tuple (advance,u0,vtop,u1,vbottom), with the texture coordinates
+        of the left, top, right and bottom of the character.  Characters that are not in
+        the atlas are replaced by a question mark.
+
+        :param char: The character to look up
+        :type char:  ``str`` of length 1
+        """
+        glyph = self._glyphs.get(char)
+        return self._glyphs['?'] if glyph is None else glyph
+
+
+class _GlyphImage(object):
+    """
+    A stand-in for the texture of a label, keeping the pixels the label renders.
+
+    A label renders its text on the CPU and then copies the pixels into its texture.
+    Giving the label this object in place of a texture keeps those pixels, so the atlas
+    is never read back from the graphics card.
+    """
+    # Attribute rows: The rows of RGBA pixels, top row first (None until rendered)
+    # Invariant: rows is None or a list of bytes
+
+    def __init__(self):
+        """
+        Makes a stand-in with no pixels.
+        """
+        self.rows = None
+
+    def blit_data(self,data):
+        """
+        Keeps the pixels rendered by a label.
+
+        :param data: The pixels rendered by the label
+        :type data:  a Kivy ``ImageData`` in rgba format
+        """
+        assert data.fmt == 'rgba', '%s is not a supported format' % repr(data.fmt)
+        size = data.width*4
+        stride = data.rowlength if data.rowlength else size
+        self.rows = [bytes(data.data[row*stride:row*stride+size]) for row in range(data.height)]
+        if not data.flip_vertical:
+            self.rows.reverse()
+
+
+# #mark -
+class GBitmapText(GObject):
+    """
+    A class representing a single line of text drawn from a glyph atlas.
+
+    This object can be used in place of a :class:`GLabel` for text that changes often,
+    like a score.  Changing ``text`` does not render anything; it only rewrites the
+    vertices of one mesh.  Changing the font or its size loads another atlas, which is
+    only slow the first time that font and size are used.
+
+    As with a label, ``linecolor`` is the color of the text and ``fillcolor`` is the
+    color of the background.  The ``width`` and ``height`` of this object are always the
+    size of the text, and the text is centered at ``(x,y)``.  Unlike a label, this object
+    does not support multiple lines.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text of this object.
+
+        **Invariant**: Must be a string
+        """
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value != self._text:
+            self._text = value
+            if self._defined:
+                self._layout()
+
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file to use as a font, or None for the Kivy font.
+
+        **Invariant**: Must be None or a string referring to a .ttf file in folder Fonts
+        """
+        return self._fname
+
+    @font_name.setter
+    def font_name(self,value):
+        assert value is None or GameApp.is_font(value), 'value %s is not a font name' % repr(value)
+        self._fname = value
+        if self._defined:
+            self._load()
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Invariant**: Must be a positive number (int or float)
+        """
+        return self._fsize
+
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._fsize = value
+        if self._defined:
+            self._load()
+
+    # CLASS METHODS
+    @classmethod
+    def preload(cls,font_name,font_size):
+        """
+        Makes the glyph atlas for the given font and size ahead of time.
+
+        Rendering an atlas is slow, so a game should call this (e.g. with
+        :meth:`AssetLoader.add`) before it shows text in a new font or size.
+
+        :param font_name: The .ttf file of the font, or None for the Kivy font
+        :type font_name:  ``str`` or None
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+        """
+        assert font_name is None or GameApp.is_font(font_name), '%s is not a font name' % repr(font_name)
+        assert type(font_size) in [int,float] and font_size > 0, '%s is not a valid size' % repr(font_size)
+        GlyphAtlas.load(font_name,font_size)
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new line of text.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show a
+        score with the font of a label, use the constructor call::
+
+            GBitmapText(text='Score: 0',font_name='Arcade.ttf',font_size=36)
+
+        This class supports the all same keywords as :class:`GObject` (except ``width``
+        and ``height``, which come from the text), as well as ``text``, ``font_name``
+        and ``font_size``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._text = ''
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        self._atlas = None
+        self._mesh = Mesh(mode='triangles')
+        self._background = None
+
+        sanitized = {}
+        for key in keywords:
+            if not key in ['width','height']:
+                sanitized[key] = keywords[key]
+        GObject.__init__(self,**sanitized)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._load()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+    # HIDDEN METHODS
+    def _load(self):
+        """
+        Loads the atlas of the current font, and rebuilds the drawing cache.
+        """
+        self._atlas = GlyphAtlas.load(self._fname,self._fsize)
+        self._mesh.texture = self._atlas.texture
+        self._layout()
+        self._reset()
+
+    def _layout(self):
+        """
+        Rewrites the mesh vertices for the current text.
+
+        This also sets the width and height, and resizes the background (if any) in
+        place, without resetting the drawing cache.
+        """
+        atlas = self._atlas
+        total = 0
+        glyphs = []
+        for char in self._text:
+            glyph = atlas.glyph(char)
+            glyphs.append(glyph)
+            total += glyph[0]
+
+        top = atlas.height/2.0
+        bottom = -top
+        left = -total/2.0
+        vertices = []
+        indices  = []
+        for (advance,u0,v0,u1,v1) in glyphs:
+            right = left+advance
+            n = len(vertices)//4
+            vertices.extend((left,bottom,u0,v1, right,bottom,u1,v1,
+                             right,top,u1,v0, left,top,u0,v0))
+            indices.extend((n,n+1,n+2, n+2,n+3,n))
+            left = right
+
+        self._mesh.vertices = vertices
+        self._mesh.indices  = indices
+        self._width  = float(max(total,1))
+        self._height = float(max(atlas.height,1))
+        if self._background is not None:
+            self._background.pos  = (-self._width/2.0,-self._height/2.0)
+            self._background.size = (self._width,self._height)
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._background = None
+        if self.fillcolor:
+            x = -self.width/2.0
+            y = -self.height/2.0
+            self._background = Rectangle(pos=(x,y),size=(self.width,self.height))
+            self._cache.add(self._fillcolor)
+            self._cache.add(self._background)
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
@@ -14,8 +14,6 @@ from kivy.graphics.instructions import *
 from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
-from introcs.geom import Point2
-
 
 class GInput(object):
     """
@@ -95,6 +93,7 @@ class GInput(object):
         if self._touch is None:
             return None
 
+        from introcs.geom import Point2
         return Point2(self._touch.x/dp(1),self._touch.y/dp(1))
 
     @property
@@ -310,6 +309,200 @@ class GInput(object):
         self._touch = None
 
 
+# #mark -
+class GLayer(object):
+    """
+    A class representing one layer of a :class:`GView`.
+
+    A layer holds the Kivy graphics commands of the objects drawn in it.  It can be
+    used in place of the view when drawing an object, as in ``obj.draw(view.layer('hud'))``.
+    Layers are drawn in order of their depth, whatever the order of the calls to draw.
+
+    A normal layer is emptied at the start of every frame (or diffed against the last
+    frame, in retained mode).  A static layer instead keeps what was drawn in it until
+    it is invalidated.  Drawing to a valid static layer does nothing, so it costs
+    nothing to keep drawing the same objects every frame.  Invalidate a static layer
+    whenever an object in it changes in a way that makes a new drawing cache, or when
+    objects should appear or disappear.
+
+    **You should never construct an object of this class**.  Use :meth:`GView.addlayer`
+    instead.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def name(self):
+        """
+        The name of this layer.
+
+        **Immutable**: This value cannot be changed after the layer is made.
+        """
+        return self._name
+
+    @property
+    def depth(self):
+        """
+        The depth of this layer.  Layers with a larger depth are drawn on top.
+
+        **Immutable**: This value cannot be changed after the layer is made.
+        """
+        return self._depth
+
+    @property
+    def static(self):
+        """
+        Whether this layer keeps its contents until it is invalidated.
+
+        **Immutable**: This value cannot be changed after the layer is made.
+        """
+        return self._static
+
+    @property
+    def valid(self):
+        """
+        Whether this static layer holds a complete drawing.
+
+        This is always False for a layer that is not static.
+
+        **Immutable**: This value is changed by :meth:`invalidate`.
+        """
+        return self._valid
+
+    # MUTABLE PROPERTIES
+    @property
+    def retained(self):
+        """
+        Whether this layer keeps its contents from one frame to the next.
+
+        See :attr:`GView.retained`.  This has no effect on a static layer.  Changing this
+        value empties the layer.
+
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._group.clear()
+        self._contents.clear()
+        self._stamps = {}
+        self._order = []
+        self._next  = []
+        self._retained = value
+        self._valid = False
+
+    # BUILT-IN METHODS
+    def __init__(self,name,depth,static=False,retained=False):
+        """
+        Creates a new, empty layer.
+
+        :param name: The name of the layer
+        :type name:  ``str``
+
+        :param depth: The depth of the layer
+        :type depth:  ``int`` or ``float``
+
+        :param static: Whether the layer keeps its contents until invalidated
+        :type static:  ``bool``
+
+        :param retained: Whether the layer is in retained mode
+        :type retained:  ``bool``
+        """
+        assert type(name) == str, '%s is not a string' % repr(name)
+        assert type(depth) in [int,float], '%s is not a number' % repr(depth)
+        assert type(static) == bool, '%s is not a bool' % repr(static)
+        self._name = name
+        self._depth = depth
+        self._static = static
+        self._group = InstructionGroup()
+        self._contents = set()
+        self._generation = 0
+        self.retained = retained
+
+    # PUBLIC METHODS
+    def draw(self,cmd):
+        """
+        Draws the given Kivy graphics command to this layer.
+
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        if self._static:
+            if not self._valid and not cmd in self._contents:
+                self._group.add(cmd)
+                self._contents.add(cmd)
+        elif self._retained:
+            if self._stamps.get(cmd) != self._generation:
+                self._stamps[cmd] = self._generation
+                self._next.append(cmd)
+        elif not cmd in self._contents:
+            self._group.add(cmd)
+            self._contents.add(cmd)
+
+    def invalidate(self):
+        """
+        Empties this static layer, so that it is drawn again in this frame.
+
+        This method does nothing to a layer that is not static.
+        """
+        if self._static:
+            self._group.clear()
+            self._contents.clear()
+            self._valid = False
+
+    # HIDDEN METHODS
+    def _begin(self):
+        """
+        Starts a new frame.
+
+        A normal layer is emptied.  In retained mode, its contents stay on screen until
+        the frame is committed.  A static layer is left alone.
+        """
+        if self._static:
+            return
+        if self._retained:
+            self._generation += 1
+            self._next = []
+        else:
+            self._group.clear()
+            self._contents.clear()
+
+    def _commit(self):
+        """
+        Finishes the frame just drawn.
+
+        A static layer becomes valid.  In retained mode, if the objects that stayed on
+        screen are still in the same order, only the objects that left are removed and
+        the new ones inserted.  Otherwise, the contents are rebuilt.
+        """
+        if self._static:
+            self._valid = True
+            return
+        if not self._retained or self._next == self._order:
+            return
+
+        current = self._generation
+        survivors = []
+        for cmd in self._order:
+            if self._stamps.get(cmd) == current:
+                survivors.append(cmd)
+            else:
+                self._group.remove(cmd)
+                del self._stamps[cmd]
+
+        kept = set(survivors)
+        if [cmd for cmd in self._next if cmd in kept] == survivors:
+            for pos in range(len(self._next)):
+                if not self._next[pos] in kept:
+                    self._group.insert(pos,self._next[pos])
+        else:
+            self._group.clear()
+            for cmd in self._next:
+                self._group.add(cmd)
+        self._order = self._next
+
+
 # #mark -
 class GView(FloatLayout):
     """
@@ -319,12 +512,44 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    The view may also be divided into named layers with :meth:`addlayer`.  An object
+    is drawn in a layer by passing the layer (from :meth:`layer`) in place of the view.
+    Anything drawn directly to the view is below every layer.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE PROPERTIES
+    @property
+    def retained(self):
+        """
+        Whether this view keeps its contents from one frame to the next.
+
+        Normally the view is emptied at the start of every frame, and every object is
+        added again as it is drawn.  In retained mode, the view instead remembers what
+        was drawn in the last frame.  At the end of a frame, it only removes the objects
+        that were not drawn again and inserts the ones that are new, so a frame where
+        nothing appears or disappears costs Kivy no work at all.  Objects are still
+        drawn in the order of the calls to :meth:`draw`.
+
+        This applies to every layer that is not static.  Changing this value empties
+        those layers.
+
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._retained = value
+        for layer in self._layers:
+            if not layer.static:
+                layer.retained = value
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -336,11 +561,13 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
-        self._frame = InstructionGroup()
+        self._base = GLayer('',0)
+        self._layers = [self._base]
+        self._names = {}
+        self._retained = False
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
 
 
     # PUBLIC METHODS
@@ -354,21 +581,64 @@ class GView(FloatLayout):
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
-            self._contents.add(cmd)
+        self._base.draw(cmd)
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  In
+        retained mode, this only starts a new frame; the contents stay on screen
+        until the frame is committed.  Static layers are not cleared.
         """
-        self._frame.clear()
-        self._contents.clear()
+        for layer in self._layers:
+            layer._begin()
+
+    def addlayer(self,name,depth,static=False):
+        """
+        Adds a new layer to this view, returning it.
+
+        The layer is drawn above every layer with a smaller depth, and above anything
+        drawn directly to the view.  It is in retained mode if this view is.
+
+        :param name: The name of the layer
+        :type name:  ``str`` that is not the name of another layer
+
+        :param depth: The depth of the layer
+        :type depth:  ``int`` or ``float``
+
+        :param static: Whether the layer keeps its contents until invalidated
+        :type static:  ``bool``
+        """
+        assert not name in self._names, 'there is already a layer %s' % repr(name)
+        layer = GLayer(name,depth,static,self._retained and not static)
+        self._names[name] = layer
+        self._layers.append(layer)
+        # The base is always first; sorting is stable
+        self._layers[1:] = sorted(self._layers[1:],key=lambda layer: layer.depth)
+        self._reset()
+        return layer
+
+    def layer(self,name):
+        """
+        Returns the layer with the given name.
+
+        :param name: The name of the layer
+        :type name:  ``str`` naming a layer made with :meth:`addlayer`
+        """
+        return self._names[name]
 
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Finishes the frame just drawn in every layer.
+
+        This method is called for you automatically at the end of the animation frame.
+        """
+        for layer in self._layers:
+            layer._commit()
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -378,4 +648,5 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
-        self.canvas.add(self._frame)
+        for layer in self._layers:
+            self.canvas.add(layer._group)
@@ -8,6 +8,8 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.core.audio import SoundLoader
 from .app import GameApp
+import os
+import time
 
 
 class Sound(object):
@@ -22,10 +24,17 @@ class Sound(object):
     When a sound is played, it cannot be played again until it finishes, or is stopped.  
     This means that if you want multiple, simultaneous sound effects from the same WAV 
     file.you will need to create multiple Sound objects.
+    
+    Decoding a sound file is slow, and every Sound decodes its own copy.  Objects that
+    only need to play a sound now and then should share one with :meth:`load`, which
+    decodes each file once for the whole program.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
     
+    # The sounds shared by load, by file name
+    SOUND_CACHE = {}
+    
     # MUTABLE PROPERTIES
     @property
     def volume(self):
@@ -68,6 +77,46 @@ class Sound(object):
         """ 
         return self._sound.state == 'play'
     
+    # CLASS METHODS
+    @classmethod
+    def load(cls,source):
+        """
+        Returns the shared sound for the given file, loading it if necessary.
+        
+        Every call with the same file returns the same object.  Use the constructor
+        instead if you need a sound that can play at the same time as the shared one.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        """
+        sound = cls.SOUND_CACHE.get(source)
+        if sound is None:
+            sound = cls(source)
+            cls.SOUND_CACHE[source] = sound
+        return sound
+    
+    @classmethod
+    def preload(cls,names=None):
+        """
+        Loads the shared sounds for the given files, so that :meth:`load` is fast.
+        
+        If ``names`` is None, every sound in the **Sounds** folder is loaded.  Sounds
+        that were already loaded are not loaded again.
+        
+        :param names: The file names of the sounds to load, or None for every sound
+        :type names:  ``list`` of ``str``, or None
+        
+        :return: The number of sounds in the cache
+        :rtype:  ``int`` >= 0
+        """
+        if names is None:
+            names = [name for name in sorted(os.listdir(GameApp.sounds)) 
+                     if os.path.splitext(name)[1].lower() in GameApp.SOUND_TYPES]
+        for name in names:
+            cls.load(name)
+        return len(cls.SOUND_CACHE)
+    
+    # BUILT-IN METHODS
     def __init__(self,source):
         """
         Creates a new sound from a file.
@@ -103,6 +152,248 @@ class Sound(object):
         self._sound.stop()
 
 
+# #mark -
+class VoicePool(object):
+    """
+    A class playing sounds on a fixed number of preloaded voices.
+    
+    A :class:`Sound` cannot overlap with itself, so playing the same effect many times
+    at once needs many copies of the sound.  This class keeps those copies, called voices,
+    for each sample added with :meth:`add`.  All of the voices are decoded when the
+    sample is added, so playing a sound never loads anything.
+    
+    A call to :meth:`play` does not start a sound right away.  It only triggers the
+    sample, and the triggered samples are started by :meth:`update`, which should be
+    called once an animation frame.  All the triggers of a sample in the same frame
+    are coalesced, and at most ``cap`` voices of the sample start in that frame.  A voice
+    is chosen round-robin among the voices that are not playing.  If every voice is
+    busy, the voice that started first is stolen; if ``steal`` is False, the trigger is
+    dropped instead.
+    
+    The pool keeps the time between the first trigger of a sample in a frame and the
+    call that starts its voice.  Use :meth:`latency` to tune the number of voices.
+    """
+    
+    # MUTABLE PROPERTIES
+    @property
+    def steal(self):
+        """
+        Whether a trigger steals the oldest voice when every voice is busy.
+        
+        If this is False, a trigger is dropped when every voice is busy.
+        
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._steal
+    
+    @steal.setter
+    def steal(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._steal = value
+    
+    # BUILT-IN METHODS
+    def __init__(self,voices=4,steal=True):
+        """
+        Creates a new, empty voice pool.
+        
+        :param voices: The default number of voices of a sample
+        :type voices:  ``int`` > 0
+        
+        :param steal: Whether to steal the oldest voice when every voice is busy
+        :type steal:  ``bool``
+        """
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        self._voices = voices
+        self.steal = steal
+        # The samples, by file name
+        self._samples = {}
+    
+    def __len__(self):
+        """
+        :return: The number of samples in this pool.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._samples)
+    
+    def __contains__(self,source):
+        """
+        :return: True if the sample ``source`` is in this pool.
+        :rtype:  ``bool``
+        """
+        return source in self._samples
+    
+    # PUBLIC METHODS
+    def add(self,source,voices=None,cap=1):
+        """
+        Adds a sample to this pool, loading its voices.
+        
+        If ``voices`` is None, the sample gets the default number of voices of the pool.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        
+        :param voices: The number of voices of the sample, or None
+        :type voices:  ``int`` > 0 or None
+        
+        :param cap: The most voices of the sample that start in one frame
+        :type cap:  ``int`` > 0
+        """
+        assert not source in self._samples, '%s is already in this pool' % repr(source)
+        if voices is None:
+            voices = self._voices
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        assert type(cap) == int and cap > 0, '%s is not a valid cap' % repr(cap)
+        self._samples[source] = _Sample(source,voices,cap)
+    
+    def play(self,source):
+        """
+        Triggers a sample, to start at the next :meth:`update`.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str`` of a sample in this pool
+        """
+        sample = self._samples[source]
+        if sample.pending == 0:
+            sample.trigger = time.perf_counter()
+        sample.pending += 1
+    
+    def update(self):
+        """
+        Starts the samples triggered since the last update.
+        
+        This method should be called once an animation frame (e.g. at the end of
+        :meth:`GameApp.draw`), so that the triggers of every step of the frame are
+        coalesced.
+        """
+        for sample in self._samples.values():
+            if sample.pending:
+                for _ in range(min(sample.pending,sample.cap)):
+                    self._start(sample)
+                sample.pending = 0
+                sample.trigger = None
+    
+    def stop(self):
+        """
+        Stops every voice, and forgets the triggers not yet started.
+        """
+        for sample in self._samples.values():
+            for voice in sample.voices:
+                voice.stop()
+            sample.pending = 0
+            sample.trigger = None
+    
+    def latency(self,source):
+        """
+        Returns the trigger to start latency of a sample.
+        
+        The result is a tuple (started,dropped,mean,max), with the number of voices
+        started and triggers dropped, and the mean and largest latency in seconds.
+        
+        The latency is only the time in Python from the first call to :meth:`play` in a
+        frame to the call that starts the voice in :meth:`update`.  It does not include
+        the time the audio backend takes to make the sound heard.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str`` of a sample in this pool
+        """
+        sample = self._samples[source]
+        mean = sample.total/sample.started if sample.started else 0.0
+        return (sample.started,sample.dropped,mean,sample.worst)
+    
+    # HIDDEN METHODS
+    def _start(self,sample):
+        """
+        Starts one voice of a sample, recording its latency.
+        
+        :param sample: The sample to start
+        :type sample:  ``_Sample``
+        """
+        voices = sample.voices
+        count = len(voices)
+        chosen = None
+        for pos in range(count):
+            if not voices[(sample.cursor+pos) % count].playing:
+                chosen = (sample.cursor+pos) % count
+                break
+        if chosen is None:
+            if not self._steal:
+                sample.dropped += 1
+                return
+            chosen = sample.starts.index(min(sample.starts))
+            voices[chosen].stop()
+        
+        voices[chosen].play()
+        now = time.perf_counter()
+        sample.starts[chosen] = now
+        sample.cursor = (chosen+1) % count
+        delay = now-sample.trigger
+        sample.started += 1
+        sample.total += delay
+        sample.worst = max(sample.worst,delay)
+
+
+class _Sample(object):
+    """
+    A class holding the voices of one sample of a :class:`VoicePool`, and its triggers.
+    
+    This class is only a record for :class:`VoicePool`, so its attributes are public
+    to that class.  You should never use it directly.
+    """
+    # Attribute voices: The voices of the sample, each a copy of the sound
+    # Invariant: voices is a nonempty list of Sound objects
+    #
+    # Attribute starts: The time each voice was last started (0 if never)
+    # Invariant: starts is a list of floats, as long as voices
+    #
+    # Attribute cursor: The voice to try first in the next start (round-robin)
+    # Invariant: cursor is an int in 0..len(voices)-1
+    #
+    # Attribute cap: The most voices of the sample that start in one frame
+    # Invariant: cap is an int > 0
+    #
+    # Attribute pending: The number of triggers since the last update
+    # Invariant: pending is an int >= 0
+    #
+    # Attribute trigger: The time of the first trigger since the last update
+    # Invariant: trigger is a float, or None if pending is 0
+    #
+    # Attribute started: The number of voices started
+    # Invariant: started is an int >= 0
+    #
+    # Attribute dropped: The number of triggers dropped as every voice was busy
+    # Invariant: dropped is an int >= 0
+    #
+    # Attribute total: The sum of the latencies of the voices started, in seconds
+    # Invariant: total is a float >= 0
+    #
+    # Attribute worst: The largest latency of a voice started, in seconds
+    # Invariant: worst is a float >= 0
+    
+    def __init__(self,source,voices,cap):
+        """
+        Creates a sample, loading its voices.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        
+        :param voices: The number of voices of the sample
+        :type voices:  ``int`` > 0
+        
+        :param cap: The most voices of the sample that start in one frame
+        :type cap:  ``int`` > 0
+        """
+        self.voices = [Sound(source) for _ in range(voices)]
+        self.starts = [0.0]*voices
+        self.cursor = 0
+        self.cap = cap
+        self.pending = 0
+        self.trigger = None
+        self.started = 0
+        self.dropped = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+
 # #mark -
 class SoundLibrary(object):
     """
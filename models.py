@@ -26,7 +26,8 @@ about whether to make a new class or not, please ask on Piazza.
 # 2021/12/07
 """
 from consts import *
-from game2d import *
+from game2d import GImage, GRectangle, GSprite, Sound
+from game2d.collision import probehit
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
 # than consts.py.  If you need extra information from Gameplay, then it should
@@ -59,7 +60,7 @@ class Ship(GSprite):
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
     # Attribute _sound: the sound of the ship when explosion
-    # Invariant: _sound is a sound object
+    # Invariant: _sound is the shared Sound object of SHIP_SOUND
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getSound(self):
@@ -83,30 +84,21 @@ class Ship(GSprite):
         Precondition: source is a string, representing the ship
         """
         super().__init__(x=x, y=y, width=SHIP_WIDTH, height=SHIP_HEIGHT,\
-        source=source,format=(2,4))
-        self._sound = Sound(SHIP_SOUND)
+        source=source,format=SHIP_FORMAT)
+        self._sound = Sound.load(SHIP_SOUND)
 
     def scollides(self,bolt):
         """
         Returns True if the alien bolt collides with the ship.
 
-        This method returns False if bolt was not fired by the alien.
+        This method returns False if bolt was not fired by the alien.  The
+        hit test is the one of Bolt.overlaps.
 
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        tl = (bolt.x - self.width//2, bolt.y+self.height//2)
-        tr = (bolt.x + self.width//2, bolt.y+self.height//2)
-        bl = (bolt.x - self.width//2, bolt.y-self.height//2)
-        br = (bolt.x - self.width//2, bolt.y-self.height//2)
-        if self.contains(tl) or self.contains(tr) or self.contains(bl) or\
-         self.contains(br):
-            if bolt.getVelocity() < 0:
-                return True
-            else:
-                return False
-        else:
-            return False
+        return bolt.getVelocity() < 0 and \
+        bolt.overlaps(self.x,self.y,SHIP_WIDTH,SHIP_HEIGHT)
 
     def move(self,key):
         """
@@ -174,7 +166,7 @@ class Alien(GImage):
     """
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
     # Attribute _sound: the sound of the alien when explosion
-    # Invariant: _sound is a sound object
+    # Invariant: _sound is the shared Sound object of ALIEN_SOUND
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getSound(self):
@@ -199,30 +191,21 @@ class Alien(GImage):
         """
         super().__init__(x=x, y=y, width=ALIEN_WIDTH, height=ALIEN_HEIGHT,\
         source=source)
-        self._sound = Sound(ALIEN_SOUND)
+        self._sound = Sound.load(ALIEN_SOUND)
 
     # METHOD TO CHECK FOR COLLISION (IF DESIRED)
     def acollides(self,bolt):
         """
         Returns True if the player bolt collides with this alien
 
-        This method returns False if bolt was not fired by the player.
+        This method returns False if bolt was not fired by the player.  The
+        hit test is the one of Bolt.overlaps.
 
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        tl = (bolt.x - self.width//2, bolt.y+self.height//2)
-        tr = (bolt.x + self.width//2, bolt.y+self.height//2)
-        bl = (bolt.x - self.width//2, bolt.y-self.height//2)
-        br = (bolt.x - self.width//2, bolt.y-self.height//2)
-        if self.contains(tl) or self.contains(tr) or self.contains(bl) or \
-        self.contains(br):
-            if bolt.getVelocity() > 0:
-                return True
-            else:
-                return False
-        else:
-            return False
+        return bolt.getVelocity() > 0 and \
+        bolt.overlaps(self.x,self.y,ALIEN_WIDTH,ALIEN_HEIGHT)
 
 
 class Bolt(GRectangle):
@@ -283,6 +266,27 @@ class Bolt(GRectangle):
         """
         self.y += self._velocity
 
+    def overlaps(self,x,y,width,height):
+        """
+        Returns True if this bolt hits a target rectangle. False otherwise.
+
+        This is the hit test of probehit in game2d.collision, with this bolt
+        as the probe.  It does no checking, as it is called for every bolt and target.
+
+        Parameter x: the x position of the target center
+        Precondition: x is an int or float
+
+        Parameter y: the y position of the target center
+        Precondition: y is an int or float
+
+        Parameter width: the width of the target
+        Precondition: width is an int or float > 0
+
+        Parameter height: the height of the target
+        Precondition: height is an int or float > 0
+        """
+        return probehit(self.x,self.y,x,y,width,height)
+
     def isPlayerBolt(self):
         """
         Returns True is the bolt is fired by the player. False otherwise.
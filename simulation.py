@@ -0,0 +1,1014 @@
+"""
+Simulation module for Alien Invaders
+
+This module contains the gameplay state of a single wave, without any of the
+drawables.  Nothing in this module touches Kivy, so a wave can be stepped on a
+machine with no window or GL context (for automated playthroughs, say).  The
+class Wave in wave.py wraps an instance of WaveState and only keeps its
+sprites in sync with it.
+
+Positions in this module use the same coordinates as the game window: every
+alien, bolt and the ship is identified by the (x,y) of its center.
+
+# Rachel Yan (sy625)
+# 2021/12/07
+"""
+from consts import *
+from game2d.collision import probereach
+import numpy as np
+import random
+import math
+
+# PRIMARY RULE: This module may only access consts.py and game2d.collision.
+# It must never use the drawables of game2d, as they need a window.
+
+
+def probesweeps(bx,y0,y1,tx,ty,width,height):
+    """
+    Returns the result of probesweep for many bolts or targets at once.
+
+    The arguments are numpy arrays or numbers, which are broadcast together,
+    so one bolt can be tested against many targets, or many bolts against
+    one target.  The result is a numpy array of the times of probesweep,
+    with inf where the bolt misses.  A bolt at rest (y0 == y1) hits at time 0
+    exactly where probehit is True.
+
+    Parameter bx: the x positions of the bolts
+    Precondition: bx is an int, float or numpy array
+
+    Parameter y0, y1: the y positions of the bolts before and after the move
+    Precondition: y0 and y1 are ints, floats or numpy arrays
+
+    Parameter tx, ty: the centers of the targets
+    Precondition: tx and ty are ints, floats or numpy arrays
+
+    Parameter width, height: the size of every target
+    Precondition: width and height are ints or floats > 0
+    """
+    reach = probereach(height)
+    lo = ty-reach
+    hi = ty+reach
+    low = np.minimum(y0,y1)
+    high = np.maximum(y0,y1)
+    # The bolt path (closed) meets the open interval (lo,hi) of the target
+    hit = (np.abs(bx-tx) < probereach(width)) & (high > lo) & (low < hi)
+    # The distance left to the near edge, which is <= 0 if already inside.
+    # A hit at rest is always inside, so the tiny length there gives time 0.
+    enter = np.maximum(np.where(y1 > y0,lo-y0,y0-hi),0.0)
+    return np.where(hit,enter/np.maximum(high-low,1e-300),np.inf)
+
+
+class Formation(object):
+    """
+    A class storing a grid of aliens as a structure of numpy arrays.
+
+    Every array has one entry per alien, indexed by [row,col] with row 0 at the
+    bottom.  The entries of destroyed aliens are kept, but are marked in alive.
+    The arrays x and y hold the starting positions of the aliens; the formation
+    moves as a unit, so its movement is kept separately in the offset (dx,dy).
+    Moving the whole formation is then a single addition, no matter how many
+    aliens there are.
+
+    Attribute rows: the number of rows of aliens
+    Invariant: rows is an int > 0
+
+    Attribute cols: the number of aliens in a row
+    Invariant: cols is an int > 0
+
+    Attribute x: the starting x positions of the alien centers
+    Invariant: x is a (rows,cols) array of floats, equal within each column
+
+    Attribute y: the starting y positions of the alien centers
+    Invariant: y is a (rows,cols) array of floats, equal within each row
+
+    Attribute dx: the horizontal distance moved by the formation
+    Invariant: dx is a float; an alien is at x position x[r,c]+dx
+
+    Attribute dy: the vertical distance moved by the formation
+    Invariant: dy is a float; an alien is at y position y[r,c]+dy
+
+    Attribute alive: whether each alien is still in the wave
+    Invariant: alive is a (rows,cols) array of bools
+
+    Attribute kind: the index in ALIEN_IMAGES of each alien
+    Invariant: kind is a (rows,cols) array of ints in 0..len(ALIEN_IMAGES)-1
+
+    Attribute score: the points each alien is worth
+    Invariant: score is a (rows,cols) array of ints > 0
+
+    Attribute bottom: the row of the lowest alien left in each column
+    Invariant: bottom is a list of cols ints, where bottom[c] is the lowest
+    row r with alive[r,c], or -1 if column c is empty
+
+    Attribute columns: the columns that still have aliens, in no order
+    Invariant: columns is a list of the ints c with bottom[c] >= 0
+
+    Attribute left: the leftmost column that still has aliens
+    Invariant: left is an int in 0..cols-1, or -1 if the formation is empty
+
+    Attribute right: the rightmost column that still has aliens
+    Invariant: right is an int in 0..cols-1, or -1 if the formation is empty
+
+    Attribute lowest: the lowest row that still has aliens
+    Invariant: lowest is an int in 0..rows-1, or -1 if the formation is empty
+
+    Attribute count: the number of aliens left
+    Invariant: count is an int >= 0, the number of True entries of alive
+
+    Attribute floor: the y position of the lowest row of aliens
+    Invariant: floor is y[lowest,0]+dy, or None if the formation is empty
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x0: the starting x position of column 0
+    # Invariant: _x0 is a float; column c starts at _x0+c*_px
+    #
+    # Attribute _y0: the starting y position of row 0
+    # Invariant: _y0 is a float; row r starts at _y0+r*_py
+    #
+    # Attribute _px: the distance between the centers of two columns
+    # Invariant: _px is a float > 0
+    #
+    # Attribute _py: the distance between the centers of two rows
+    # Invariant: _py is a float > 0
+    #
+    # Attribute _slot: the position of each column in the list columns
+    # Invariant: _slot is a list of cols ints, where columns[_slot[c]] == c for
+    # every column c that still has aliens
+    #
+    # Attribute _rowcount: the number of aliens left in each row
+    # Invariant: _rowcount is a list of rows ints >= 0
+
+    def __init__(self,rows,cols):
+        """
+        Initializes a full formation in its starting position.
+
+        The top row is ALIEN_CEILING below the top of the window, and the
+        first column is one alien (plus separation) from the left edge.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+        """
+        self.rows = rows
+        self.cols = cols
+        r = np.arange(rows).reshape(rows,1)
+        c = np.arange(cols).reshape(1,cols)
+        shape = (rows,cols)
+        self.x = np.broadcast_to((c+1)*(ALIEN_H_SEP+ALIEN_WIDTH),shape).astype(float)
+        self.y = np.broadcast_to(GAME_HEIGHT-ALIEN_CEILING-(rows-r-1)*\
+        (ALIEN_V_SEP+ALIEN_HEIGHT),shape).astype(float)
+        self.alive = np.ones(shape,dtype=bool)
+        self.kind = np.broadcast_to(r//2%len(ALIEN_IMAGES),shape).copy()
+        self.score = np.broadcast_to(ALIEN_POINTS*(rows-r),shape).copy()
+        self.dx = 0.0
+        self.dy = 0.0
+        self._px = float(ALIEN_H_SEP+ALIEN_WIDTH)
+        self._py = float(ALIEN_V_SEP+ALIEN_HEIGHT)
+        self._x0 = float(self.x[0,0])
+        self._y0 = float(self.y[0,0])
+        self.bottom = [0]*cols
+        self.columns = list(range(cols))
+        self.left = 0
+        self.right = cols-1
+        self.lowest = 0
+        self.count = rows*cols
+        self.floor = float(self.y[0,0])
+        self._slot = list(range(cols))
+        self._rowcount = [cols]*rows
+
+    def move(self,dx,dy):
+        """
+        Moves the whole formation.
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is an int or float
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is an int or float
+        """
+        self.dx += dx
+        self.dy += dy
+        if dy and self.floor is not None:
+            self.floor += dy
+
+    def leftx(self):
+        """
+        Returns the x position of the leftmost column of aliens.
+
+        Precondition: the formation is not empty
+        """
+        return self.x[0,self.left]+self.dx
+
+    def rightx(self):
+        """
+        Returns the x position of the rightmost column of aliens.
+
+        Precondition: the formation is not empty
+        """
+        return self.x[0,self.right]+self.dx
+
+    def lowesty(self):
+        """
+        Returns the y position of the lowest row of aliens.
+
+        Precondition: the formation is not empty
+        """
+        return self.floor
+
+    def near(self,x,y,reachx,reachy):
+        """
+        Returns the block of the formation whose aliens may be close to a
+        point.
+
+        The aliens sit on a regular grid that moves as a unit, so the cells
+        near (x,y) are found by arithmetic, without looking at any alien.  The
+        result is a pair (rows,cols) of slices, to index the arrays with (as
+        in alive[rows,cols]).  The block contains every alien with a center
+        less than reachx horizontally and reachy vertically from (x,y), and
+        possibly a few more; it may be empty.  Dead aliens are not left out,
+        so check alive.
+
+        Parameter x: the x position of the point
+        Precondition: x is an int or float
+
+        Parameter y: the y position of the point
+        Precondition: y is an int or float
+
+        Parameter reachx: the horizontal distance to search
+        Precondition: reachx is an int or float >= 0
+
+        Parameter reachy: the vertical distance to search
+        Precondition: reachy is an int or float >= 0
+        """
+        # The columns strictly between u-ru and u+ru (and likewise for rows),
+        # widened by a hair so that rounding never loses a cell
+        u = (x-self.dx-self._x0)/self._px
+        v = (y-self.dy-self._y0)/self._py
+        ru = reachx/self._px+1e-9
+        rv = reachy/self._py+1e-9
+        c0 = max(0,int(math.floor(u-ru))+1)
+        c1 = min(self.cols-1,int(math.ceil(u+ru))-1)
+        r0 = max(0,int(math.floor(v-rv))+1)
+        r1 = min(self.rows-1,int(math.ceil(v+rv))-1)
+        return (slice(r0,max(r0,r1+1)),slice(c0,max(c0,c1+1)))
+
+    def kill(self,row,col):
+        """
+        Removes an alien from the formation.
+
+        This keeps the bounds and the count of the formation up to date.
+        Only the column of the alien is searched, and only if it was the
+        bottom one.  The edges and the floor only move if the alien left its
+        row or column empty.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int in 0..rows-1, and the alien is alive
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..cols-1
+        """
+        self.alive[row,col] = False
+        self.count -= 1
+        self._rowcount[row] -= 1
+        if row == self.lowest and self._rowcount[row] == 0:
+            while self.lowest < self.rows and self._rowcount[self.lowest] == 0:
+                self.lowest += 1
+            if self.lowest == self.rows:
+                self.lowest = -1
+                self.floor = None
+            else:
+                self.floor = float(self.y[self.lowest,0])+self.dy
+        if self.bottom[col] != row:
+            return
+        above = self.alive[row+1:,col]
+        if above.any():
+            self.bottom[col] = row+1+int(above.argmax())
+        else:
+            # Swap the last live column into the empty slot
+            self.bottom[col] = -1
+            slot = self._slot[col]
+            last = self.columns.pop()
+            if last != col:
+                self.columns[slot] = last
+                self._slot[last] = slot
+            if not self.columns:
+                self.left = -1
+                self.right = -1
+                return
+            while self.bottom[self.left] == -1:
+                self.left += 1
+            while self.bottom[self.right] == -1:
+                self.right -= 1
+
+
+class BoltStore(object):
+    """
+    A class holding the state of every laser bolt on screen.
+
+    The bolts are stored as parallel NumPy columns, so that moving them and
+    finding the ones that left the screen are single operations on the whole
+    store.  Bolt i is described by x[i], y[i], velocity[i], prev[i] and
+    ident[i], for every i less than len(store).  The entries past that are
+    unused room for more bolts.
+
+    Removing a bolt moves the last bolt into its place, so the index of a bolt
+    can change.  Its ident never does, and index finds the bolt again.
+
+    Attribute x: the x position of the bolt centers
+    Invariant: x is a 1d float array, at least as long as the store
+
+    Attribute y: the y position of the bolt centers
+    Invariant: y is a 1d float array as long as x
+
+    Attribute velocity: the velocity in y direction of the bolts
+    Invariant: velocity is a 1d float array as long as x, with nonzero values
+    for the bolts in the store
+
+    Attribute prev: the y position of the bolt centers before their last move
+    Invariant: prev is a 1d float array as long as x
+
+    Attribute ident: the name of each bolt, unique among the bolts in the store
+    Invariant: ident is a 1d int array as long as x
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _size: the number of bolts in the store
+    # Invariant: _size is an int between 0 and len(x)
+    #
+    # Attribute _slot: the index of every bolt by its ident
+    # Invariant: _slot is a dict with _slot[ident[i]] == i for every i < _size
+    #
+    # Attribute _next: the ident of the next bolt added
+    # Invariant: _next is an int greater than every ident in the store
+
+    def __init__(self,capacity=BOLT_POOL):
+        """
+        Initializes an empty store with room for capacity bolts.
+
+        The store grows when it is full, so capacity is only a hint.
+
+        Parameter capacity: the number of bolts to make room for
+        Precondition: capacity is an int > 0
+        """
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.velocity = np.zeros(capacity)
+        self.prev = np.zeros(capacity)
+        self.ident = np.zeros(capacity,int)
+        self._size = 0
+        self._slot = {}
+        self._next = 0
+
+    def __len__(self):
+        """
+        Returns the number of bolts in the store.
+        """
+        return self._size
+
+    def index(self,ident):
+        """
+        Returns the current index of the bolt with the given ident.
+
+        Parameter ident: the ident of the bolt
+        Precondition: ident is the ident of a bolt in the store
+        """
+        return self._slot[ident]
+
+    def add(self,x,y,vb):
+        """
+        Adds a bolt that has not moved yet, returning its ident.
+
+        Parameter x: the x position of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: the y position of the bolt
+        Precondition: y is an int or float
+
+        Parameter vb: the velocity of the bolt
+        Precondition: vb is a nonzero int or float
+        """
+        n = self._size
+        if n == len(self.x):
+            self._grow()
+        self.x[n] = x
+        self.y[n] = y
+        self.velocity[n] = vb
+        self.prev[n] = y
+        self.ident[n] = self._next
+        self._slot[self._next] = n
+        self._next += 1
+        self._size = n+1
+        return self._next-1
+
+    def remove(self,i):
+        """
+        Removes the bolt at index i, returning its ident.
+
+        The last bolt of the store takes index i.
+
+        Parameter i: the index of the bolt
+        Precondition: i is an int in 0..len(self)-1
+        """
+        last = self._size-1
+        gone = int(self.ident[i])
+        del self._slot[gone]
+        if i != last:
+            for column in (self.x,self.y,self.velocity,self.prev,self.ident):
+                column[i] = column[last]
+            self._slot[int(self.ident[i])] = i
+        self._size = last
+        return gone
+
+    def clear(self):
+        """
+        Removes every bolt from the store.
+        """
+        self._size = 0
+        self._slot.clear()
+
+    def advance(self):
+        """
+        Moves every bolt by its velocity, remembering where it was.
+        """
+        n = self._size
+        self.prev[:n] = self.y[:n]
+        self.y[:n] += self.velocity[:n]
+
+    def outside(self):
+        """
+        Returns the indices of the bolts that are out of the screen.
+
+        The indices are in increasing order.
+        """
+        # Same as bottom >= GAME_HEIGHT or top <= 0, in one comparison
+        half = GAME_HEIGHT/2.0
+        y = self.y[:self._size]
+        return (np.abs(y-half) >= half+BOLT_HEIGHT//2).nonzero()[0]
+
+    def _grow(self):
+        """
+        Doubles the room for bolts, keeping the bolts in the store.
+        """
+        for name in ('x','y','velocity','prev','ident'):
+            old = getattr(self,name)
+            column = np.zeros(2*len(old),old.dtype)
+            column[:len(old)] = old
+            setattr(self,name,column)
+
+
+class EventQueue(object):
+    """
+    A class collecting what happened during one update of a wave.
+
+    Gameplay code posts an event whenever something happens (an alien is
+    destroyed, the ship is hit, and so on) and keeps going.  Everything that
+    reacts to events, like sounds, the HUD or a recording of the game, looks
+    at them once, after the update.  Several kills in one update then only
+    cost one reaction instead of one each.
+
+    An event is a tuple (kind,data), where kind is one of the EVENT constants
+    in consts.py and the meaning of data depends on the kind.  The queue can be
+    iterated over to see the events of the last update, in the order they
+    happened.  Listeners added with subscribe are given them in dispatch.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _events: the events of the last update
+    # Invariant: _events is a list of (kind,data) tuples, possibly empty
+    #
+    # Attribute _listeners: the functions called by dispatch
+    # Invariant: _listeners is a list of callables taking a list of events
+
+    def __init__(self):
+        """
+        Initializes an empty queue with no listeners.
+        """
+        self._events = []
+        self._listeners = []
+
+    def __len__(self):
+        """
+        Returns the number of events in the queue.
+        """
+        return len(self._events)
+
+    def __iter__(self):
+        """
+        Returns an iterator over the events in the queue.
+        """
+        return iter(self._events)
+
+    def post(self,kind,data=None):
+        """
+        Adds an event to the queue.
+
+        Parameter kind: the kind of event
+        Precondition: kind is one of the EVENT constants in consts.py
+
+        Parameter data: the details of the event
+        Precondition: data is as described for kind in consts.py
+        """
+        self._events.append((kind,data))
+
+    def subscribe(self,listener):
+        """
+        Adds a function to call with the events in dispatch.
+
+        Parameter listener: the function to add
+        Precondition: listener is a callable taking a list of events
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self,listener):
+        """
+        Removes a function added with subscribe.
+
+        Parameter listener: the function to remove
+        Precondition: listener was added with subscribe
+        """
+        self._listeners.remove(listener)
+
+    def dispatch(self):
+        """
+        Gives the events in the queue to every listener.
+
+        Each listener is called once, with the list of every event, even if
+        that list is empty.  The list is owned by the queue and should not be
+        modified.
+        """
+        for listener in self._listeners:
+            listener(self._events)
+
+    def clear(self):
+        """
+        Removes every event from the queue.
+        """
+        self._events = []
+
+
+class WaveState(object):
+    """
+    This class holds the gameplay state of a single wave of Alien Invaders.
+
+    It implements exactly the rules that Wave used to apply to its sprites:
+    the ship moves and fires, the aliens march back and forth and fire back,
+    bolts destroy what they hit, and the wave ends when the aliens are gone or
+    cross the defense line.  Instead of GObjects it only keeps numbers, so one
+    call to update is cheap enough to run many thousands of times a second.
+
+    Every call to update also records what happened during that step (which
+    aliens died, how often the ship was hit, and so on) as events in a queue,
+    so that a renderer can play sounds and refresh its sprites afterwards.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _aliens: the aliens of the wave
+    # Invariant: _aliens is a Formation object
+    #
+    # Attribute _shipx: the x position of the ship
+    # Invariant: _shipx is an int or float, or None if there is no ship
+    #
+    # Attribute _shipprev: the x position of the ship before the last update
+    # Invariant: _shipprev is an int or float, or None if there was no ship
+    #
+    # Attribute _shots: the laser bolts fired by the ship currently on screen
+    # Invariant: _shots is a BoltStore object with velocities > 0
+    #
+    # Attribute _bolts: the laser bolts fired by the aliens currently on screen
+    # Invariant: _bolts is a BoltStore object with velocities < 0
+    #
+    # Attribute _time: the amount of time since the last alien "step" was due
+    # Invariant: _time is a float >= 0s
+    #
+    # Attribute _direction: the direction of left or right of the aliens moving
+    # Invariant: _direction is 1 or -1
+    #
+    # Attribute _blank: the number of alien steps between alien bolts
+    # Invariant: _blank is an int between 1 and BOLT_RATE
+    #
+    # Attribute _step: The number of steps the aliens moved since the last bolt
+    # Invariant: _step is an int >= 0
+    #
+    # Attribute _moves: The number of steps the aliens moved in this wave
+    # Invariant: _moves is an int >= 0
+    #
+    # Attribute _dying: the time spent in the ship explosion
+    # Invariant: _dying is a float >= 0, or None if the ship is not exploding
+    #
+    # Attribute _detect: the condition of the ship hit by a bolt or not
+    # Invariant: _detect is a bool
+    #
+    # Attribute _dead: the condition of the ship dead or not
+    # Invariant: _dead is a bool
+    #
+    # Attribute _lives: The number of lives of the ship
+    # Invariant: _lives is an int between 0 and SHIP_LIVES
+    #
+    # Attribute _win: The condition of the player winning the game or not
+    # Invariant: _win is a bool
+    #
+    # Attribute _score: The score of the player
+    # Invariant: _score is an int >= 0
+    #
+    # Attribute _events: what happened during the last update
+    # Invariant: _events is an EventQueue object
+    #
+    # Attribute _random: the random number generator for alien fire
+    # Invariant: _random is a random.Random object
+
+    # GETTERS AND SETTERS
+    def getDead(self):
+        """
+        Returns the condition of the ship is dead or not.
+        """
+        return self._dead
+
+    def setDead(self,yesno):
+        """
+        Sets the condition of the ship dead or not.
+
+        Parameter yesno: The condition of ship dead or not
+        Precondition: yesno is a bool
+        """
+        self._dead = yesno
+
+    def getLives(self):
+        """
+        Returns the number of lives of the ship.
+        """
+        return self._lives
+
+    def getWin(self):
+        """
+        Returns the condition of the player win or not.
+        """
+        return self._win
+
+    def getScore(self):
+        """
+        Returns the score of the player.
+        """
+        return self._score
+
+    def getShipX(self):
+        """
+        Returns the x position of the ship, or None if there is no ship.
+        """
+        return self._shipx
+
+    def getShipPrevX(self):
+        """
+        Returns the x position of the ship before the last update.
+
+        This is None if there was no ship.  Together with getShipX, this allows
+        a renderer to draw the ship in between two updates.
+        """
+        return self._shipprev
+
+    def getShipFrame(self):
+        """
+        Returns the frame of the ship explosion filmstrip to display.
+
+        The frame is 0 while the ship is not exploding.
+        """
+        if self._dying is None:
+            return 0
+        count = SHIP_FORMAT[0]*SHIP_FORMAT[1]
+        return min(int(self._dying/DEATH_SPEED*count)+1,count-1)
+
+    def getAlien(self,row,col):
+        """
+        Returns the (x,y) position of an alien, or None if it was destroyed.
+
+        Parameter row: the row of the alien, 0 being the bottom row
+        Precondition: row is an int in 0..rows-1 of the formation
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..cols-1 of the formation
+        """
+        f = self._aliens
+        if not f.alive[row,col]:
+            return None
+        return (float(f.x[row,col]+f.dx),float(f.y[row,col]+f.dy))
+
+    def getFormation(self):
+        """
+        Returns the formation of aliens.
+
+        The formation is owned by this object and should not be modified.
+        """
+        return self._aliens
+
+    def getMoves(self):
+        """
+        Returns the number of steps the aliens have moved in this wave.
+        """
+        return self._moves
+
+    def hasPlayerBolt(self):
+        """
+        Returns True if a bolt fired by the ship is on screen. False otherwise.
+        """
+        return len(self._shots) > 0
+
+    def getShots(self):
+        """
+        Returns the bolts fired by the ship currently on screen.
+
+        The store is owned by this object and should not be modified.  The
+        order of the bolts in it can change in any update.
+        """
+        return self._shots
+
+    def getBolts(self):
+        """
+        Returns the bolts fired by the aliens currently on screen.
+
+        The store is owned by this object and should not be modified.  The
+        order of the bolts in it can change in any update.
+        """
+        return self._bolts
+
+    def getEvents(self):
+        """
+        Returns the queue of the events of the last update.
+
+        The queue is emptied at the start of every update.
+        """
+        return self._events
+
+    def getKills(self):
+        """
+        Returns the (row,col) of every alien destroyed in the last update.
+        """
+        return [data for (kind,data) in self._events if kind == EVENT_KILL]
+
+    def getHits(self):
+        """
+        Returns the number of bolts that hit the ship in the last update.
+        """
+        return sum(1 for (kind,data) in self._events if kind == EVENT_HIT)
+
+    # INITIALIZER
+    def __init__(self,seed=None,rows=ALIEN_ROWS,cols=ALIENS_IN_ROW):
+        """
+        Initializes the state of a new wave.
+
+        Unlike the command line arguments in consts.py, the formation size is
+        not capped here, so large formations can be simulated.
+
+        Parameter seed: the seed for the alien fire, for repeatable runs
+        Precondition: seed is None or a value accepted by random.Random
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in a row
+        Precondition: cols is an int > 0
+        """
+        self._random = random.Random(seed)
+        self._aliens = Formation(rows,cols)
+        self._shipx = GAME_WIDTH//2
+        self._shipprev = self._shipx
+        self._shots = BoltStore()
+        self._bolts = BoltStore()
+        self._time = 0
+        self._direction = 1
+        self._blank = self._random.randint(1,BOLT_RATE)
+        self._step = 0
+        self._moves = 0
+        self._dying = None
+        self._detect = False
+        self._dead = False
+        self._lives = SHIP_LIVES
+        self._win = False
+        self._score = 0
+        self._events = EventQueue()
+
+    # UPDATE METHOD
+    def update(self,dt,left,right,fire):
+        """
+        Advances the wave by one animation frame.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+
+        Parameter left: whether the ship should move left
+        Precondition: left is a bool
+
+        Parameter right: whether the ship should move right
+        Precondition: right is a bool
+
+        Parameter fire: whether the ship should fire
+        Precondition: fire is a bool
+        """
+        self._events.clear()
+        self._shipprev = self._shipx
+        if self._shipx is not None and self._dying is None:
+            if right:
+                self._shipx = min(GAME_WIDTH-SHIP_WIDTH//2,self._shipx+SHIP_MOVEMENT)
+            if left:
+                self._shipx = max(SHIP_WIDTH/2,self._shipx-SHIP_MOVEMENT)
+        self._time += dt
+        if self._time > ALIEN_SPEED:
+            self._movealien()
+            self._time -= ALIEN_SPEED
+            self._step += 1
+            self._moves += 1
+        self._shipbolt(fire)
+        self._alienbolt()
+        self._deletealien()
+        self._deleteship()
+        self._animation(dt)
+        self._checkline()
+
+    def resumegame(self):
+        """
+        Set the conditions for the game to continue after pausing.
+        """
+        self._dead = False
+        self._shipx = GAME_WIDTH//2
+        self._shipprev = self._shipx
+        self._detect = False
+
+    # HELPER METHODS
+    def _addbolt(self,x,y,vb):
+        """
+        Puts a new bolt on screen.
+
+        Parameter x: the x position of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: the y position of the bolt
+        Precondition: y is an int or float
+
+        Parameter vb: the velocity of the bolt
+        Precondition: vb is a nonzero int or float
+        """
+        self._events.post(EVENT_FIRE,vb)
+        if vb > 0:
+            self._shots.add(x,y,vb)
+        else:
+            self._bolts.add(x,y,vb)
+
+    def _movealien(self):
+        """
+        Move all the aliens one step.
+
+        The aliens walk sideways until the outermost column would come within
+        ALIEN_H_SEP of the edge of the screen.  Then they move down one step
+        and reverse their direction.
+        """
+        f = self._aliens
+        if not f.columns:
+            return
+        right1 = GAME_WIDTH - (f.rightx() + ALIEN_WIDTH//2)
+        left1 = f.leftx() - ALIEN_WIDTH//2
+        rightresult = self._direction == 1 and right1 > ALIEN_H_SEP
+        leftresult = self._direction == -1 and left1 > ALIEN_H_SEP
+        if rightresult or leftresult:
+            f.move(self._direction * ALIEN_H_WALK,0)
+        else:
+            f.move(0,-ALIEN_V_WALK)
+            self._direction *= -1
+
+    def _shipbolt(self,fire):
+        """
+        Moves the bolts on screen and fires a new bolt from the ship.
+
+        Bolts that have left the screen are removed.  The ship only fires if
+        there is no other player bolt on screen.
+
+        Parameter fire: whether the ship should fire
+        Precondition: fire is a bool
+        """
+        # Going backwards, the bolt swapped into a hole is always kept
+        s = self._shots
+        if len(s):
+            for i in s.outside()[::-1].tolist():
+                s.remove(i)
+            s.advance()
+        b = self._bolts
+        if len(b):
+            for i in b.outside()[::-1].tolist():
+                b.remove(i)
+            b.advance()
+        if fire and not self.hasPlayerBolt() and self._dying is None and \
+        self._shipx is not None:
+            self._addbolt(self._shipx,SHIP_HEIGHT+SHIP_BOTTOM,BOLT_SPEED)
+
+    def _alienbolt(self):
+        """
+        Fires a bolt from a random alien every _blank alien steps.
+
+        The shooter is the bottom alien of a random nonempty column.
+        """
+        if self._step == self._blank:
+            f = self._aliens
+            if f.columns:
+                c = f.columns[self._random.randint(0,len(f.columns)-1)]
+                r = f.bottom[c]
+                self._addbolt(float(f.x[r,c]+f.dx),\
+                float(f.y[r,c]+f.dy)-ALIEN_HEIGHT//2,-BOLT_SPEED)
+            self._step = 0
+            self._blank = self._random.randint(1,BOLT_RATE)
+
+    def _deletealien(self):
+        """
+        Removes every alien hit by a player bolt, along with the bolt.
+
+        The bolts are swept along their path since the last update, so a
+        fast bolt cannot pass through an alien between two updates.  A bolt
+        destroys the alien it hits first, going through the rows from the
+        bottom to break ties.  Each kill adds the score of that alien.  A hit
+        can only happen within one alien size of the path, so only the few
+        grid cells that close to it are tested, all at once.
+        """
+        f = self._aliens
+        b = self._shots
+        for ident in b.ident[:len(b)].tolist():
+            i = b.index(ident)
+            bx = float(b.x[i])
+            y0 = float(b.prev[i])
+            y1 = float(b.y[i])
+            reach = ALIEN_HEIGHT+abs(y1-y0)/2.0
+            (rows,cols) = f.near(bx,(y0+y1)/2.0,ALIEN_WIDTH,reach)
+            if rows.start == rows.stop or cols.start == cols.stop:
+                continue
+            times = probesweeps(bx,y0,y1,f.x[rows,cols]+f.dx,\
+            f.y[rows,cols]+f.dy,ALIEN_WIDTH,ALIEN_HEIGHT)
+            times = np.where(f.alive[rows,cols],times,np.inf)
+            # The first smallest time, in order of row then column
+            k = int(times.argmin())
+            if times.flat[k] < np.inf:
+                (r,c) = np.unravel_index(k,times.shape)
+                r = int(r)+rows.start
+                c = int(c)+cols.start
+                f.kill(r,c)
+                self._score += int(f.score[r,c])
+                self._events.post(EVENT_KILL,(r,c))
+                b.remove(i)
+
+    def _deleteship(self):
+        """
+        Removes every alien bolt that hits the ship and records the hit.
+
+        As with the aliens, the bolts are swept along their path since the
+        last update.  All of the bolts are swept against the ship at once.
+        """
+        if self._shipx is not None:
+            b = self._bolts
+            n = len(b)
+            if n:
+                times = probesweeps(b.x[:n],b.prev[:n],b.y[:n],self._shipx,\
+                SHIP_BOTTOM+SHIP_HEIGHT//2,SHIP_WIDTH,SHIP_HEIGHT)
+                # Backwards, as the last bolt takes the place of a removed one
+                for i in np.flatnonzero(times < np.inf)[::-1].tolist():
+                    b.remove(i)
+                    self._events.post(EVENT_HIT)
+                    self._detect = True
+        else:
+            self._detect = False
+
+    def _animation(self,dt):
+        """
+        Advances the explosion of the ship, removing the ship when it is done.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        if self._dying is not None:
+            self._dying += dt
+            count = SHIP_FORMAT[0]*SHIP_FORMAT[1]
+            if int(self._dying/DEATH_SPEED*count)+1 >= count:
+                self._dying = None
+                self._shipx = None
+                self._shots.clear()
+                self._bolts.clear()
+                self._dead = True
+                self._lives -= 1
+                if self._lives == 0:
+                    self._events.post(EVENT_LOSE)
+        elif self._detect:
+            self._dying = 0.0
+
+    def _checkline(self):
+        """
+        Check whether alien went past defenseline and whether all aliens killed.
+
+        End the game and state the player win if all the aliens are killed. End
+        the game and state that the player lost if the aliens went past the
+        defense line.  Both tests use values the formation keeps up to
+        date, so this takes the same time however many aliens are left.
+        """
+        f = self._aliens
+        if f.count == 0:
+            if not self._win:
+                self._events.post(EVENT_WIN)
+            self._dead = True
+            self._win = True
+        elif f.floor-ALIEN_HEIGHT//2 <= DEFENSE_LINE:
+            if self._lives > 0:
+                self._events.post(EVENT_LOSE)
+            self._win = False
+            self._dead = True
+            self._lives = 0
@@ -0,0 +1,138 @@
+"""
+Cold start benchmark for Alien Invaders
+
+Run this script in the game folder with 'python startup.py'.  It starts the game
+in fresh interpreters and reports
+
+    the import time of the modules imported by __main__.py (from the option
+    -X importtime of Python), largest first, and
+
+    the time from launching __main__.py to the end of the first frame drawn.
+
+The script exits with status 1 if either time is over its budget below, so that
+cold start can be checked like any other regression.  The first frame needs a
+window; without a display, only the imports are checked.
+"""
+import os
+import subprocess
+import sys
+import time
+
+# The time allowed to import everything in __main__.py, in seconds
+IMPORT_BUDGET = 1.0
+# The time allowed from launch to the end of the first frame, in seconds
+FRAME_BUDGET  = 3.0
+# The number of modules to report
+TOP_MODULES   = 15
+# The time to wait for a first frame before giving up, in seconds
+FRAME_TIMEOUT = 30
+
+# The folder of the game
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def importtimes():
+    """
+    Returns the import time of each module imported by __main__.py.
+
+    The result is a list of (seconds,depth,name) triples, in the order Python
+    reports them.  The time of a module includes the modules it imports in
+    turn, which have a larger depth.  The modules imported by Python itself on
+    startup are left out.  The game itself is not started.
+    """
+    code = "import runpy; runpy.run_path('__main__.py',run_name='startup')"
+    result = subprocess.run([sys.executable,'-X','importtime','-c',code],
+        cwd=FOLDER,capture_output=True,text=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        (_,cumulative,name) = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented two spaces a level
+        depth = (len(name)-len(name.lstrip())-1)//2
+        times.append((int(cumulative)/1e6,depth,name.strip()))
+        if depth == 0 and name.strip() == 'runpy':
+            times = []
+    return times
+
+
+def frametime():
+    """
+    Returns the time from launching __main__.py to the end of the first frame.
+
+    The result is None if the game never drew a frame (e.g. there is no
+    display).
+    """
+    # Kivy must not read the option --frame as its own
+    env = dict(os.environ,KIVY_NO_ARGS='1')
+    launch = time.time()
+    try:
+        result = subprocess.run([sys.executable,os.path.abspath(__file__),
+            '--frame'],cwd=FOLDER,env=env,capture_output=True,text=True,
+            timeout=FRAME_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return None
+    for line in result.stdout.splitlines():
+        if line.startswith('frame '):
+            return float(line.split()[1])-launch
+    return None
+
+
+def firstframe():
+    """
+    Runs the game of __main__.py, printing the clock time at the end of the
+    first frame and quitting.
+    """
+    import runpy
+    game = runpy.run_path(os.path.join(FOLDER,'__main__.py'),run_name='startup')
+    Invaders = game['Invaders']
+
+    class TimedInvaders(Invaders):
+        """
+        The game, quitting after its first frame.
+        """
+        def draw(self,alpha=1.0):
+            """
+            Draws the first frame, then prints the time and quits.
+
+            Parameter alpha: the fraction of a step since the last update
+            Precondition: alpha is a float in 0..1
+            """
+            Invaders.draw(self,alpha)
+            print('frame',time.time())
+            sys.stdout.flush()
+            self.stop()
+
+    TimedInvaders(width=game['GAME_WIDTH'],height=game['GAME_HEIGHT'],
+        tickrate=game['GAME_TICKRATE']).run()
+
+
+def report():
+    """
+    Prints the cold start times, and returns True if they are in budget.
+    """
+    ok = True
+    times = importtimes()
+    total = sum(seconds for (seconds,depth,name) in times if depth == 0)
+    print('imports: %.3fs (budget %.3fs)' % (total,IMPORT_BUDGET))
+    for (seconds,depth,name) in sorted(times,reverse=True)[:TOP_MODULES]:
+        print('  %8.3fs  %s' % (seconds,name))
+    ok = ok and total <= IMPORT_BUDGET
+
+    frame = frametime()
+    if frame is None:
+        print('first frame: not drawn (is there a display?)')
+    else:
+        print('first frame: %.3fs (budget %.3fs)' % (frame,FRAME_BUDGET))
+        ok = ok and frame <= FRAME_BUDGET
+    return ok
+
+
+# Application code
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--frame']:
+        firstframe()
+    else:
+        sys.exit(0 if report() else 1)
@@ -0,0 +1,12 @@
+"""
+Test configuration for Alien Invaders
+
+The game modules are not a package, so the game folder is put on the path.
+Kivy is told not to read the options of pytest as its own.
+"""
+import os
+import sys
+
+os.environ.setdefault('KIVY_NO_ARGS','1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG','1')
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,381 @@
+"""
+Tests of the state messages in app.py
+
+The messages are GLabel objects, and making one renders its text.  These tests
+replace GLabel with a class that counts how many are made, start Invaders
+with a stand-in for the asset loader, and then drive its states with a
+stand-in for the wave.  No window is opened.
+"""
+import pytest
+import app
+from consts import *
+
+
+class CountedLabel(object):
+    """
+    A stand-in for GLabel that counts how many labels are made of each text.
+    """
+    # The number of labels made so far, by text
+    made = {}
+
+    def __init__(self,**keywords):
+        """
+        Initializes a label, counting it.
+
+        Parameter keywords: the attributes of the label
+        Precondition: keywords are the keywords of GLabel
+        """
+        self.text = keywords['text']
+        CountedLabel.made[self.text] = CountedLabel.made.get(self.text,0)+1
+
+
+class FakeRectangle(object):
+    """
+    A stand-in for GRectangle, which needs a window.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Initializes a rectangle that is never drawn.
+
+        Parameter keywords: the attributes of the rectangle
+        Precondition: keywords are the keywords of GRectangle
+        """
+        pass
+
+
+class FakeText(object):
+    """
+    A stand-in for GBitmapText that only records the fonts preloaded.
+    """
+    # The (font_name,font_size) pairs preloaded so far
+    fonts = []
+
+    @classmethod
+    def preload(cls,font_name,font_size):
+        """
+        Records that a font was preloaded.
+
+        Parameter font_name: the name of the font
+        Precondition: font_name is a string
+
+        Parameter font_size: the size of the font
+        Precondition: font_size is an int > 0
+        """
+        cls.fonts.append((font_name,font_size))
+
+
+class FakeInput(object):
+    """
+    A stand-in for GInput where the key S is tapped every other frame.
+    """
+
+    def __init__(self):
+        """
+        Initializes the input with no key down.
+        """
+        self._down = False
+
+    def tap(self):
+        """
+        Flips the key S between down and up.
+        """
+        self._down = not self._down
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is S and it is down.
+
+        Parameter key: the key to check
+        Precondition: key is a string
+        """
+        return self._down and key == 's'
+
+    @property
+    def key_count(self):
+        """
+        The number of keys down.
+        """
+        return 1 if self._down else 0
+
+
+class FakeLayer(object):
+    """
+    A stand-in for a layer of GView that only accepts being invalidated.
+    """
+
+    def invalidate(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+class FakeView(object):
+    """
+    A stand-in for GView that records the layers added.
+    """
+
+    def __init__(self):
+        """
+        Initializes the view with no layers, in immediate mode.
+        """
+        self.retained = False
+        self.layers = []
+
+    def addlayer(self,name,depth,static):
+        """
+        Records a new layer.
+
+        Parameter name: the name of the layer
+        Precondition: name is a string
+
+        Parameter depth: the depth of the layer
+        Precondition: depth is an int >= 0
+
+        Parameter static: whether the layer is static
+        Precondition: static is a bool
+        """
+        self.layers.append(name)
+
+    def layer(self,name):
+        """
+        Returns a layer that accepts being invalidated.
+
+        Parameter name: the name of the layer
+        Precondition: name is a string
+        """
+        assert name in self.layers
+        return FakeLayer()
+
+
+class FakeLoader(object):
+    """
+    A stand-in for an AssetLoader that only does its work when run.
+    """
+
+    def __init__(self):
+        """
+        Initializes the loader with no work.
+        """
+        self._jobs = []
+
+    @property
+    def done(self):
+        """
+        Whether all of the work is done.
+        """
+        return not self._jobs
+
+    def add(self,work):
+        """
+        Queues work to do.
+
+        Parameter work: the work to do
+        Precondition: work is a function with no arguments
+        """
+        self._jobs.append(work)
+
+    def run(self):
+        """
+        Does all of the work queued, in order.
+        """
+        while self._jobs:
+            self._jobs.pop(0)()
+
+
+class FakeVoices(object):
+    """
+    A stand-in for VoicePool with nothing to play.
+    """
+
+    def add(self,name,voices):
+        """
+        Does nothing.
+        """
+        pass
+
+    def update(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+class FakeWave(object):
+    """
+    A stand-in for Wave where the ship is shot down in every update.
+    """
+    # The lives left after the ship is shot down, in the next wave made
+    lives = 2
+    # Whether the next wave made is won
+    win = False
+
+    def __init__(self,voices):
+        """
+        Initializes the wave.
+
+        Parameter voices: the voices of the explosions
+        Precondition: voices is a VoicePool
+        """
+        self._lives = FakeWave.lives
+        self._win = FakeWave.win
+
+    def update(self,dt,input):
+        """
+        Does nothing, as the ship is always shot down.
+        """
+        pass
+
+    def getDead(self):
+        """
+        Returns True, as the ship is always shot down.
+        """
+        return True
+
+    def getLives(self):
+        """
+        Returns the lives left.
+        """
+        return self._lives
+
+    def getWin(self):
+        """
+        Returns True if the wave is won.
+        """
+        return self._win
+
+    def resumegame(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+def preload(self,**keywords):
+    """
+    Returns a FakeLoader, in place of GameApp.preload.
+
+    Parameter keywords: the options of the loader (ignored)
+    Precondition: keywords are the keywords of GameApp.preload
+    """
+    self._loader = FakeLoader()
+    return self._loader
+
+
+@pytest.fixture
+def game(monkeypatch):
+    """
+    Returns an Invaders just after start, whose assets are not loaded yet.
+
+    The app is never run, so the window and the assets are replaced by the
+    stand-ins above, and the view and input are made here.
+    """
+    monkeypatch.setattr(app,'GLabel',CountedLabel)
+    monkeypatch.setattr(app,'GRectangle',FakeRectangle)
+    monkeypatch.setattr(app,'GBitmapText',FakeText)
+    monkeypatch.setattr(app,'VoicePool',FakeVoices)
+    monkeypatch.setattr(app.Invaders,'preload',preload)
+    monkeypatch.setattr(app.Invaders,'_loadwave',lambda self: FakeWave)
+    monkeypatch.setattr(CountedLabel,'made',{})
+    monkeypatch.setattr(FakeText,'fonts',[])
+    result = app.Invaders.__new__(app.Invaders)
+    result._view = FakeView()
+    result._input = FakeInput()
+    result.start()
+    return result
+
+
+def play(game):
+    """
+    Loads the assets of game and starts a wave, returning the texts made.
+
+    The key S is tapped to start the wave, and stays down.
+    """
+    game.loader.run()
+    made = dict(CountedLabel.made)
+    game.update(0)
+    assert game._text is game._messages['start']
+    game.input.tap()
+    game.update(0)
+    assert game._state == STATE_NEWWAVE
+    game.update(0)
+    assert game._state == STATE_ACTIVE
+    return made
+
+
+def test_start(game):
+    """
+    Only the loading message is made in start; it stays up until loaded.
+    """
+    assert CountedLabel.made == {'Loading...':1}
+    assert list(game._messages) == ['loading']
+    assert game.view.retained
+    assert FakeText.fonts == []
+    for _ in range(3):
+        game.update(0)
+        assert game._state == STATE_INACTIVE
+        assert game._text is game._messages['loading']
+    assert CountedLabel.made == {'Loading...':1}
+
+
+def test_loaded(game):
+    """
+    Every message is made once by the loader, and the start message replaces
+    the loading one.
+    """
+    game.loader.run()
+    assert sorted(game._messages) == ['continue','loading','lose','start','win']
+    for label in game._messages.values():
+        assert CountedLabel.made[label.text] == 1
+    assert FakeText.fonts == [(ARCADE_FONT,ARCADE_SMALL)]
+    assert game._text is game._messages['loading']
+    game.update(0)
+    assert game._state == STATE_INACTIVE
+    assert game._text is game._messages['start']
+    game.update(0)
+    assert game._text is game._messages['start']
+
+
+def test_made_once(game):
+    """
+    The messages are made once, and only shown again in the later states.
+    """
+    made = play(game)
+    assert game._text is None
+
+    game.update(0)
+    assert game._state == STATE_PAUSED
+    game.input.tap()
+    for _ in range(3):
+        game.update(0)
+        assert game._state == STATE_PAUSED
+        assert game._text is game._messages['continue']
+    game.input.tap()
+    game.update(0)
+    assert game._state == STATE_CONTINUE
+    game.update(0)
+    assert game._state == STATE_ACTIVE
+    assert game._text is None
+
+    game._wave._lives = 0
+    game.update(0)
+    game.update(0)
+    assert game._state == STATE_COMPLETE
+    for _ in range(3):
+        game.update(0)
+        assert game._text is game._messages['lose']
+    assert CountedLabel.made == made
+
+
+def test_made_once_win(game,monkeypatch):
+    """
+    Winning the wave shows the winning message, without making a new label.
+    """
+    monkeypatch.setattr(FakeWave,'win',True)
+    made = play(game)
+    for _ in range(5):
+        game.update(0)
+    assert game._state == STATE_COMPLETE
+    assert game._text is game._messages['win']
+    assert CountedLabel.made == made
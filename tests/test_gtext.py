@@ -0,0 +1,79 @@
+"""
+Tests of the line of text in game2d/gtext.py
+
+The drawing instructions need a GL context, so these tests open an offscreen
+window (and are skipped if there is none).  Rendering a font is still slow,
+so the glyph atlas is replaced with one where every character is 10 or 11
+pixels wide, as its code point is even or odd.
+"""
+import os
+import pytest
+from game2d import gtext
+
+
+@pytest.fixture(scope='module',autouse=True)
+def window():
+    """
+    Opens an offscreen window for the GL context, or skips the tests.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER','offscreen')
+    from kivy.core.window import Window
+    if Window is None:
+        pytest.skip('no window for a GL context')
+    return Window
+
+
+class FakeAtlas(object):
+    """
+    A stand-in for GlyphAtlas, with no texture.
+    """
+    # The texture of the atlas
+    texture = None
+    # The height of a line of text
+    height = 20
+
+    def glyph(self,char):
+        """
+        Returns the advance and texture coordinates of a character.
+
+        Parameter char: the character
+        Precondition: char is a string of length 1
+        """
+        return (10+ord(char) % 2,0.0,0.0,1.0,1.0)
+
+
+@pytest.fixture
+def label(monkeypatch):
+    """
+    Returns a GBitmapText with a background, using a FakeAtlas.
+    """
+    monkeypatch.setattr(gtext.GlyphAtlas,'load',classmethod(lambda cls,name,size: FakeAtlas()))
+    return gtext.GBitmapText(text='Score: 0',fillcolor=(0,0,0,1))
+
+
+def test_text_keeps_cache(label):
+    """
+    Changing the text of a filled label resizes its background in place.
+    """
+    cache = label._cache
+    background = label._background
+    assert background is not None
+    for text in ['Score: 10','S','Score: 12345']:
+        label.text = text
+        assert label._cache is cache
+        assert label._background is background
+        assert label.width == sum(FakeAtlas().glyph(c)[0] for c in text)
+        assert tuple(background.size) == (label.width,label.height)
+        assert tuple(background.pos) == (-label.width/2.0,-label.height/2.0)
+        assert len(label._mesh.indices) == 6*len(text)
+
+
+def test_fillcolor_resets(label):
+    """
+    Removing the fill color removes the background.
+    """
+    label.fillcolor = None
+    assert label._background is None
+    label.text = 'Score: 1'
+    label.fillcolor = (1,0,0,1)
+    assert tuple(label._background.size) == (label.width,label.height)
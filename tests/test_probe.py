@@ -0,0 +1,290 @@
+"""
+Tests of the bolt hit test in game2d/collision.py, and its batched version
+probesweeps in simulation.py
+
+These tests need no window, as the hit test never touches Kivy.
+"""
+import pytest
+import numpy as np
+import models
+from consts import *
+from game2d.collision import probereach, probehit, probesweep
+from simulation import Formation, probesweeps
+
+
+def cornerhit(bx,by,tx,ty,width,height):
+    """
+    Returns the result of the old hit test of Ship and Alien, with its four
+    corners.
+
+    A probe box the size of the target is centered on the bolt, and the bolt
+    hits if a corner is strictly inside the target.  The bottom-right corner
+    is where it should be (the old test repeated the bottom-left one).
+    """
+    for x in (bx-width//2,bx+width//2):
+        for y in (by-height//2,by+height//2):
+            if abs(x-tx) < width/2.0 and abs(y-ty) < height/2.0:
+                return True
+    return False
+
+
+class FakeBolt(object):
+    """
+    A bolt with the hit test of Bolt, without making any drawable.
+    """
+    getVelocity = models.Bolt.getVelocity
+    overlaps = models.Bolt.overlaps
+
+    def __init__(self,x,y,vb):
+        """
+        Initializes the bolt.
+
+        Parameter x, y: the center of the bolt
+        Precondition: x and y are ints or floats
+
+        Parameter vb: the velocity of the bolt
+        Precondition: vb is a nonzero int or float
+        """
+        self.x = x
+        self.y = y
+        self._velocity = vb
+
+
+class FakeTarget(object):
+    """
+    A ship or alien, only with a position.
+    """
+
+    def __init__(self,x,y):
+        """
+        Initializes the target.
+
+        Parameter x, y: the center of the target
+        Precondition: x and y are ints or floats
+        """
+        self.x = x
+        self.y = y
+
+
+def test_reach():
+    """
+    The reach along an axis is size/2 + size//2.
+    """
+    assert probereach(36) == 36
+    assert probereach(33) == 32.5
+    assert probereach(SHIP_WIDTH) == SHIP_WIDTH/2.0+SHIP_WIDTH//2
+
+
+def test_hit_center():
+    """
+    A bolt at the center of the target hits it.
+    """
+    assert probehit(100,200,100,200,ALIEN_WIDTH,ALIEN_HEIGHT)
+
+
+@pytest.mark.parametrize('size',[36,33,1])
+def test_hit_open_interval(size):
+    """
+    A bolt exactly at the reach misses; just inside, it hits.
+    """
+    reach = probereach(size)
+    for sign in (-1,1):
+        assert not probehit(sign*reach,0,0,0,size,size)
+        assert not probehit(0,sign*reach,0,0,size,size)
+        assert probehit(sign*(reach-0.01),0,0,0,size,size)
+        assert probehit(0,sign*(reach-0.01),0,0,size,size)
+
+
+def test_hit_corners():
+    """
+    The test is the same at all four corners of the probe box.
+
+    The old corner test repeated the bottom-left corner in place of the
+    bottom-right one (br == bl).  A bolt up and to the left of the target,
+    where only the bottom-right corner of the probe box is inside, missed.
+    """
+    reach = probereach(ALIEN_WIDTH)
+    inside = reach-1
+    for dx in (-inside,inside):
+        for dy in (-inside,inside):
+            assert probehit(dx,dy,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+    # Only the bottom-right corner of the probe box reaches the target
+    assert probehit(-inside,inside,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+
+
+def test_hit_center_line():
+    """
+    A bolt on the center line of an even-sized target hits it.
+
+    The old corner test missed there, as every corner was on an edge.
+    """
+    for size in (SHIP_WIDTH,36,2):
+        for d in (0,1,size-1):
+            assert probehit(0,d,0,0,size,size)
+            assert probehit(d,0,0,0,size,size)
+            assert probehit(0,-d,0,0,size,size)
+            assert probehit(-d,0,0,0,size,size)
+        assert not cornerhit(0,0,0,0,size,size)
+        assert not cornerhit(0,5,0,0,size,size)
+
+
+@pytest.mark.parametrize('size',[ALIEN_WIDTH,SHIP_WIDTH,1,2])
+def test_hit_agrees_with_corners(size):
+    """
+    The hit test is the old corner test, except on the center lines of an
+    even-sized target.
+    """
+    for dx in range(-50,51):
+        for dy in range(-50,51):
+            hit = probehit(dx,dy,0,0,size,size)
+            if size % 2 == 0 and (dx == 0 or dy == 0):
+                assert hit == (abs(dx) < size and abs(dy) < size)
+            else:
+                assert hit == cornerhit(dx,dy,0,0,size,size)
+
+
+def test_scollides():
+    """
+    Ship.scollides only counts the bolts of the aliens.
+    """
+    ship = FakeTarget(400,SHIP_BOTTOM+SHIP_HEIGHT//2)
+    assert models.Ship.scollides(ship,FakeBolt(ship.x,ship.y,-BOLT_SPEED))
+    assert models.Ship.scollides(ship,FakeBolt(ship.x+10,ship.y-20,-BOLT_SPEED))
+    assert not models.Ship.scollides(ship,FakeBolt(ship.x,ship.y,BOLT_SPEED))
+    assert not models.Ship.scollides(ship,FakeBolt(ship.x+SHIP_WIDTH,ship.y,
+        -BOLT_SPEED))
+
+
+def test_acollides():
+    """
+    Alien.acollides only counts the bolts of the player.
+    """
+    alien = FakeTarget(200,500)
+    assert models.Alien.acollides(alien,FakeBolt(alien.x,alien.y,BOLT_SPEED))
+    assert models.Alien.acollides(alien,FakeBolt(alien.x-32,alien.y+32,
+        BOLT_SPEED))
+    assert not models.Alien.acollides(alien,FakeBolt(alien.x,alien.y,
+        -BOLT_SPEED))
+    assert not models.Alien.acollides(alien,FakeBolt(alien.x-33,alien.y,
+        BOLT_SPEED))
+
+
+def test_hit_symmetric():
+    """
+    A bolt hits at the same distance on either side of the target.
+    """
+    for d in range(0,60):
+        for e in (0,5,-5):
+            assert probehit(d,e,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) == \
+            probehit(-d,-e,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+
+
+def test_sweep_already_touching():
+    """
+    A bolt touching the target at the start of the move hits at time 0.
+    """
+    assert probesweep(0,0,BOLT_SPEED,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) == 0.0
+
+
+def test_sweep_tunnel():
+    """
+    A bolt moving past the whole target in one move still hits it.
+    """
+    reach = probereach(ALIEN_HEIGHT)
+    t = probesweep(0,-100,100,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+    assert t == pytest.approx((100-reach)/200.0)
+    t = probesweep(0,100,-100,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+    assert t == pytest.approx((100-reach)/200.0)
+
+
+def test_sweep_end():
+    """
+    A bolt ending the move inside the target hits it; ending at the edge
+    does not.
+    """
+    reach = probereach(ALIEN_HEIGHT)
+    assert probesweep(0,-100,0,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) is not None
+    assert probesweep(0,-100,-reach,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) is None
+
+
+def test_sweep_miss():
+    """
+    A bolt that is too far to the side, or moves away, misses.
+    """
+    reach = probereach(ALIEN_WIDTH)
+    assert probesweep(reach,-100,100,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) is None
+    assert probesweep(0,100,200,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) is None
+    assert probesweep(0,-100,-200,0,0,ALIEN_WIDTH,ALIEN_HEIGHT) is None
+
+
+def test_sweep_agrees_with_hit():
+    """
+    The time found by the sweep is when probehit starts to be true.
+    """
+    for x in range(-40,41,4):
+        for (y0,y1) in ((-90,-20),(-50,70),(80,-10),(-30,-29)):
+            t = probesweep(x,y0,y1,0,0,ALIEN_WIDTH,ALIEN_HEIGHT)
+            steps = [y0+(y1-y0)*k/1000.0 for k in range(1001)]
+            hits = [k for k in range(1001) if
+                    probehit(x,steps[k],0,0,ALIEN_WIDTH,ALIEN_HEIGHT)]
+            if t is None:
+                assert hits == []
+            else:
+                assert hits and abs(hits[0]/1000.0-t) <= 0.001
+
+
+@pytest.mark.parametrize('size',[ALIEN_WIDTH,SHIP_WIDTH])
+def test_sweeps_agrees_with_sweep(size):
+    """
+    The batched sweep of one bolt over a grid of targets gives the same time
+    as probesweep on each target, and inf where it misses.
+    """
+    (tx,ty) = np.meshgrid(np.arange(-50.0,51.0),np.arange(-50.0,51.0,5.0))
+    for (y0,y1) in ((-90,-20),(-50,70),(80,-10),(-30,-29),(0,0),(22,22)):
+        times = probesweeps(0.0,y0,y1,tx,ty,size,size)
+        assert times.shape == tx.shape
+        for (t,x,y) in zip(times.flat,tx.flat,ty.flat):
+            expect = probesweep(0.0,y0,y1,float(x),float(y),size,size)
+            assert t == (np.inf if expect is None else expect)
+
+
+def test_sweeps_many_bolts():
+    """
+    The batched sweep of many bolts over one target agrees with probesweep.
+    """
+    rng = np.random.RandomState(7)
+    bx = rng.uniform(-60,60,500)
+    y0 = rng.uniform(-60,60,500)
+    y1 = y0+rng.uniform(-40,40,500)
+    times = probesweeps(bx,y0,y1,0.0,0.0,SHIP_WIDTH,SHIP_HEIGHT)
+    for k in range(500):
+        expect = probesweep(bx[k],y0[k],y1[k],0.0,0.0,SHIP_WIDTH,SHIP_HEIGHT)
+        assert times[k] == (np.inf if expect is None else expect)
+
+
+def test_sweeps_at_rest():
+    """
+    A bolt that does not move hits at time 0 exactly where probehit is True.
+    """
+    (tx,ty) = np.meshgrid(np.arange(-50.0,51.0),np.arange(-50.0,51.0))
+    times = probesweeps(0.0,0.0,0.0,tx,ty,SHIP_WIDTH,SHIP_HEIGHT)
+    for (t,x,y) in zip(times.flat,tx.flat,ty.flat):
+        hit = probehit(0.0,0.0,float(x),float(y),SHIP_WIDTH,SHIP_HEIGHT)
+        assert t == (0.0 if hit else np.inf)
+
+
+def test_near_block():
+    """
+    The block near a point holds every alien that a bolt there can hit.
+    """
+    f = Formation(ALIEN_ROWS,ALIENS_IN_ROW)
+    for x in range(0,GAME_WIDTH,7):
+        for y in range(0,GAME_HEIGHT,9):
+            (rows,cols) = f.near(x,y,ALIEN_WIDTH,ALIEN_HEIGHT)
+            block = np.zeros(f.alive.shape,bool)
+            block[rows,cols] = True
+            for r in range(f.rows):
+                for c in range(f.cols):
+                    if probehit(x,y,f.x[r,c]+f.dx,f.y[r,c]+f.dy,
+                                ALIEN_WIDTH,ALIEN_HEIGHT):
+                        assert block[r,c]